@@ -0,0 +1,96 @@
+"""Compare parse time and memory of get_alerts payloads: json.loads dicts vs Alert records.
+
+Usage: python -m benchmarks.alert_parse --alerts 5000 --known 0.95 --repeat 5
+
+Runs offline on a synthetic payload shaped like Aurora's, with the extra
+fields the monitor ignores.
+"""
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clients.alert_parser import parse_alerts
+
+
+def build_payload(count: int) -> bytes:
+    """A get_alerts body with count alerts spread over a few customers and environments."""
+    alerts = []
+    for i in range(count):
+        alerts.append({
+            "id": f"alert-{i}",
+            "threadID": f"thread-{i // 3}",
+            "customer": f"customer-{i % 40}",
+            "environment": ("prod", "uat", "dev")[i % 3],
+            "subject": f"Job {i % 500} failed on host-{i % 97}",
+            "severity": "critical" if i % 10 == 0 else "warning",
+            "created": "2024-05-01T12:00:00Z",
+            "updated": "2024-05-01T12:05:00Z",
+            "status": "open",
+            "assignee": None,
+            "tags": ["batch", f"region-{i % 5}"],
+            "source": {"system": "scheduler", "node": f"node-{i % 97}"},
+        })
+    return json.dumps(alerts).encode()
+
+
+def dict_path(payload: bytes, known_ids: set) -> List[Dict[str, Any]]:
+    """What the monitor did before: decode everything, then filter."""
+    return [alert for alert in json.loads(payload) if alert["id"] not in known_ids]
+
+
+def record_path(payload: bytes, known_ids: set) -> Any:
+    return parse_alerts(payload, known_ids)
+
+
+def measure(parse: Callable[[bytes, set], Any], payload: bytes, known_ids: set,
+            repeat: int) -> Tuple[float, int, int]:
+    """Return (best seconds, peak bytes while parsing, bytes still held by the result)."""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        parse(payload, known_ids)
+        timings.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    result = parse(payload, known_ids)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return min(timings), peak, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alert payload parse benchmark")
+    parser.add_argument("--alerts", type=int, default=5000, help="Alerts in the payload")
+    parser.add_argument("--known", type=float, default=0.95,
+                        help="Fraction of alert IDs already seen, as in a steady-state poll")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case; the best is reported")
+    args = parser.parse_args()
+
+    payload = build_payload(args.alerts)
+    known_ids = {f"alert-{i}" for i in range(int(args.alerts * args.known))}
+    print(f"Payload: {args.alerts} alerts, {len(payload) / 1024:.0f} KiB")
+    print(f"{'case':<32} {'parse ms':>9} {'peak KiB':>9} {'held KiB':>9}")
+
+    cases = [
+        ("dicts, first poll", dict_path, set()),
+        ("records, first poll", record_path, set()),
+        (f"dicts, {args.known:.0%} known", dict_path, known_ids),
+        (f"records, {args.known:.0%} known", record_path, known_ids),
+    ]
+    for label, parse, known in cases:
+        seconds, peak, retained = measure(parse, payload, known, args.repeat)
+        print(f"{label:<32} {seconds * 1000:9.1f} {peak / 1024:9.0f} {retained / 1024:9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Replay a synthetic alert storm through AlertMonitor against local stand-ins.
+
+Usage: python -m benchmarks.alert_storm --alerts 10000 --rate 500
+
+Requires the deployment's enums module for handler construction; the
+credentials are never sent anywhere because every client points at the
+local stand-in servers.
+"""
+import os
+import sys
+import time
+import argparse
+import logging
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_servers import AuroraStub, StubServer, TelegramStub, TwilioStub
+from clients.aurora_client import AuroraClient
+from core.alert_monitor import AlertMonitor
+from handlers.telegram_handler import TelegramHandler
+from handlers.twilio_handler import TwilioHandler
+from storage.memory_store import MemoryStateStore
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """Return p50/p95/p99/max in milliseconds."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {'p50': pick(0.5), 'p95': pick(0.95), 'p99': pick(0.99), 'max': ordered[-1] * 1000}
+
+
+def build_monitor(aurora: AuroraStub, telegram: TelegramStub, twilio: TwilioStub) -> AlertMonitor:
+    state_store = MemoryStateStore()
+    return AlertMonitor(
+        aurora_client=AuroraClient(base_url=aurora.url),
+        telegram_handler=TelegramHandler(state_store=state_store, api_url=telegram.url),
+        twilio_handler=TwilioHandler(api_url=twilio.url),
+        state_store=state_store,
+    )
+
+
+def run_storm(args: argparse.Namespace) -> Dict[str, object]:
+    stub_options = dict(latency_range=(args.latency_min, args.latency_max),
+                        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate)
+    aurora = AuroraStub(**stub_options).start()
+    telegram = TelegramStub(**stub_options).start()
+    twilio = TwilioStub(**stub_options).start()
+    servers: List[StubServer] = [aurora, telegram, twilio]
+
+    monitor = build_monitor(aurora, telegram, twilio)
+    monitor.paging_worker.call_delay = 0
+    try:
+        if not monitor.initialize():
+            raise RuntimeError("Login against the Aurora stand-in failed")
+
+        started = time.time()
+        aurora.schedule_storm(args.alerts, args.rate, threads=args.threads, start=started)
+        deadline = started + args.timeout
+
+        while len(telegram.delivered_at) < args.alerts and time.time() < deadline:
+            cycle_started = time.time()
+            monitor.trigger_telegram_alert()
+            time.sleep(max(args.poll_interval - (time.time() - cycle_started), 0))
+        finished = time.time()
+    finally:
+        monitor.stop()
+        for server in servers:
+            server.stop()
+
+    appear_at = dict(zip((alert["id"] for alert in aurora.alerts), aurora.appear_at))
+    notify_latencies = [delivered - appear_at[alert_id] for alert_id, delivered in telegram.delivered_at.items()]
+
+    return {
+        'alerts': args.alerts,
+        'delivered': len(telegram.delivered_at),
+        'telegram_messages': len(telegram.messages),
+        'calls': len(twilio.calls),
+        'duration_s': round(finished - started, 3),
+        'throughput_alerts_per_s': round(len(telegram.delivered_at) / max(finished - started, 1e-9), 1),
+        'notify_latency_ms': percentiles(notify_latencies),
+        'call_latency_ms': {
+            name: percentiles(latencies)
+            for server in servers for name, latencies in server.call_latencies.items()
+        },
+        'status_counts': {
+            name: dict(counts)
+            for server in servers for name, counts in server.status_counts.items()
+        },
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Alert storm benchmark")
+    parser.add_argument("--alerts", type=int, default=1000, help="Number of synthetic alerts")
+    parser.add_argument("--rate", type=float, default=200, help="Alerts appearing per second")
+    parser.add_argument("--threads", type=int, default=0, help="Distinct alert threads (0 = one per alert)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between alert checks")
+    parser.add_argument("--timeout", type=float, default=300, help="Give up after this many seconds")
+    parser.add_argument("--latency-min", type=float, default=0.0, help="Minimum injected latency (s)")
+    parser.add_argument("--latency-max", type=float, default=0.0, help="Maximum injected latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered 429")
+    return parser.parse_args()
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    results = run_storm(parse_args())
+    for key, value in results.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Measure cold-start import cost and fail when it exceeds a budget.
+
+Each target is imported in a fresh interpreter with -X importtime so nothing is
+cached between measurements. The monitor entry points must load requests, which
+alone costs about 140 ms, so they get a wider budget than the --check path,
+which imports no client or handler.
+
+Usage: python -m benchmarks.import_time --budget-ms 250 --check-budget-ms 75 --top 10
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from typing import List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Targets held to --check-budget-ms; everything else gets --budget-ms
+CHECK_TARGETS = ("import config.config_check", "main.py --check", "main.py --check --rules")
+
+# Validating rules compiles subject patterns and templates, which must not pull in the monitor either
+SAMPLE_RULES = {"rules": [{"name": "quiet-uat", "environment": "uat", "subject": "disk (full|low)",
+                           "template": "{customer}: {subject}", "set_severity": "trivial"}]}
+
+DEFAULT_MODULES = (
+    "config.config_check",
+    "core.alert_monitor",
+    "core.async_alert_monitor",
+    "core.tenant_monitor",
+)
+
+
+def measure(arguments: List[str]) -> Tuple[float, List[Tuple[float, str]]]:
+    """Run python -X importtime with arguments; return (total ms, [(self ms, module)])."""
+    result = subprocess.run([sys.executable, "-X", "importtime", *arguments],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode not in (0, 1):
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed")
+
+    modules = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((int(self_us) / 1000, name.strip()))
+        if not name.startswith("  "):
+            # Top-level entries: their cumulative times add up to the whole import
+            total_us += int(cumulative_us)
+    return total_us / 1000, sorted(modules, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import time budget")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="Modules to import")
+    parser.add_argument("--budget-ms", type=float, default=250,
+                        help="Fail when a monitor entry point exceeds this (0 disables)")
+    parser.add_argument("--check-budget-ms", type=float, default=75,
+                        help="Fail when the --check path exceeds this (0 disables)")
+    parser.add_argument("--top", type=int, default=5, help="Slowest modules to list per target")
+    args = parser.parse_args()
+
+    targets = [(f"import {module}", ["-c", f"import {module}"]) for module in args.modules]
+    targets.append(("main.py --check", ["main.py", "--check"]))
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as rules_file:
+        json.dump(SAMPLE_RULES, rules_file)
+    targets.append(("main.py --check --rules", ["main.py", "--check", "--rules", rules_file.name]))
+
+    try:
+        over_budget = run_targets(targets, args)
+    finally:
+        os.unlink(rules_file.name)
+
+    if over_budget:
+        print(f"Over budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+def run_targets(targets: List[Tuple[str, List[str]]], args: argparse.Namespace) -> List[str]:
+    """Measure each target and return the labels that exceeded their budget."""
+    over_budget = []
+    for label, arguments in targets:
+        try:
+            total_ms, modules = measure(arguments)
+        except RuntimeError as e:
+            print(f"{label:<35} error: {e}")
+            over_budget.append(label)
+            continue
+
+        print(f"{label:<35} {total_ms:8.1f} ms")
+        for self_ms, name in modules[:args.top]:
+            print(f"    {self_ms:8.1f} ms  {name.strip()}")
+        budget_ms = args.check_budget_ms if label in CHECK_TARGETS else args.budget_ms
+        if budget_ms and total_ms > budget_ms:
+            over_budget.append(f"{label} ({budget_ms:.0f} ms budget)")
+    return over_budget
+
+
+if __name__ == "__main__":
+    main()
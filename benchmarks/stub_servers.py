@@ -0,0 +1,305 @@
+import re
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+class StubServer:
+    """In-process HTTP stand-in with injectable latency, errors and 429s.
+
+    Subclasses register (method, path regex) routes. Every request first
+    sleeps for a random latency in latency_range, then fails with a 500 at
+    error_rate or a 429 at rate_limit_rate, and only then reaches its route.
+    """
+
+    def __init__(self, latency_range: Tuple[float, float] = (0, 0), error_rate: float = 0,
+                 rate_limit_rate: float = 0, retry_after: int = 1):
+        self.latency_range = latency_range
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.routes: List[Tuple[str, re.Pattern, Callable[..., Response], str]] = []
+        self.call_latencies: Dict[str, List[float]] = defaultdict(list)
+        self.status_counts: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def route(self, method: str, pattern: str, handler: Callable[..., Response], name: str) -> None:
+        self.routes.append((method, re.compile(pattern), handler, name))
+
+    def start(self) -> "StubServer":
+        stub = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stub._dispatch(self, "GET")
+
+            def do_POST(self):
+                stub._dispatch(self, "POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), RequestHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name=self.__class__.__name__, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _dispatch(self, request: BaseHTTPRequestHandler, method: str) -> None:
+        started = time.perf_counter()
+        parsed = urlparse(request.path)
+        length = int(request.headers.get("Content-Length") or 0)
+        body = request.rfile.read(length) if length else b""
+        params = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        if body and request.headers.get("Content-Type", "").startswith("application/x-www-form-urlencoded"):
+            params.update({key: values[-1] for key, values in parse_qs(body.decode()).items()})
+
+        name = "unknown"
+        status, headers, payload = 404, {}, b"not found"
+        for route_method, pattern, handler, route_name in self.routes:
+            match = pattern.fullmatch(parsed.path)
+            if route_method == method and match:
+                name = route_name
+                status, headers, payload = self._inject(handler, request, params, match)
+                break
+
+        request.send_response(status)
+        for key, value in headers.items():
+            request.send_header(key, value)
+        request.send_header("Content-Length", str(len(payload)))
+        request.end_headers()
+        request.wfile.write(payload)
+
+        with self._lock:
+            self.call_latencies[name].append(time.perf_counter() - started)
+            self.status_counts[name][status] += 1
+
+    def _inject(self, handler: Callable[..., Response], request: BaseHTTPRequestHandler,
+                params: Dict[str, str], match: re.Match) -> Response:
+        low, high = self.latency_range
+        if high:
+            time.sleep(random.uniform(low, high))
+
+        roll = random.random()
+        if roll < self.error_rate:
+            return 500, {}, b"injected error"
+        if roll < self.error_rate + self.rate_limit_rate:
+            return self.rate_limited()
+        return handler(request, params, *match.groups())
+
+    def rate_limited(self) -> Response:
+        return 429, {"Retry-After": str(self.retry_after)}, b"rate limited"
+
+    @staticmethod
+    def json_response(data: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+        return status, dict(headers or {}, **{"Content-Type": "application/json"}), json.dumps(data).encode()
+
+
+class AuroraStub(StubServer):
+    """Stand-in for the Aurora alert API, serving a scheduled alert storm."""
+
+    CSRF_TOKEN = "stub-csrf-token"
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.alerts: List[Dict[str, Any]] = []
+        self.appear_at: List[float] = []
+        self.dismissed = set()
+        self.escalated = set()
+        self.sessions = set()
+        self.logins = 0
+        self.route("GET", r"/alerts/login/", self._login_page, "login")
+        self.route("POST", r"/alerts/login/", self._login, "login")
+        self.route("GET", r"/alerts/get_alerts/alerts", self._get_alerts, "get_alerts")
+        self.route("GET", r"/alerts/get_thread_main_alert/([^/]+)", self._get_thread_main_alert,
+                   "get_thread_main_alert")
+        self.route("GET", r"/alerts/dismiss_thread/([^/]+)", self._dismiss, "dismiss_thread")
+        self.route("GET", r"/alerts/escalate_alert/([^/]+)/fyi/", self._escalate, "escalate_alert")
+
+    def schedule_storm(self, count: int, rate: float, threads: int = 0, critical_ratio: float = 0.2,
+                       start: Optional[float] = None) -> None:
+        """Make count synthetic alerts appear at rate alerts/s from start.
+
+        With threads > 0, alerts share that many threads, so descriptions repeat.
+        Subjects differ in letters, not just digits, so correlation keeps every
+        alert distinct.
+        """
+        start = time.time() if start is None else start
+        for i in range(count):
+            self.alerts.append({
+                "id": f"alert-{i}",
+                "threadID": f"thread-{i % threads if threads else i}",
+                "customer": f"customer{i % 7}",
+                "environment": ("prod", "uat", "dev")[i % 3],
+                "subject": f"Synthetic alert-{i} {self._letters(i)}",
+                "severity": "critical" if random.random() < critical_ratio else "trivial",
+            })
+            self.appear_at.append(start + i / rate)
+
+    @staticmethod
+    def _letters(number: int) -> str:
+        letters = ""
+        while True:
+            number, remainder = divmod(number, 26)
+            letters = chr(ord("a") + remainder) + letters
+            if not number:
+                return letters
+
+    def expire_sessions(self) -> None:
+        """Invalidate every session, as a server-side cookie expiry would."""
+        self.sessions.clear()
+
+    def _authenticated(self, request) -> bool:
+        cookies = dict(
+            part.strip().split("=", 1) for part in request.headers.get("Cookie", "").split(";") if "=" in part
+        )
+        return cookies.get("sessionid") in self.sessions
+
+    def _login_redirect(self) -> Response:
+        return 302, {"Location": "/alerts/login/?next=/alerts/"}, b""
+
+    def visible_alerts(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        return [
+            alert for alert, appear_at in zip(self.alerts, self.appear_at)
+            if appear_at <= now and alert["threadID"] not in self.dismissed
+        ]
+
+    def _login_page(self, request, params) -> Response:
+        page = f'<form><input type="hidden" name="csrfmiddlewaretoken" value="{self.CSRF_TOKEN}"></form>'
+        return 200, {"Content-Type": "text/html", "Set-Cookie": f"csrftoken={self.CSRF_TOKEN}; Path=/"}, page.encode()
+
+    def _login(self, request, params) -> Response:
+        if params.get("csrfmiddlewaretoken") != self.CSRF_TOKEN:
+            return 403, {}, b"csrf failed"
+        self.logins += 1
+        session_id = f"stub-session-{self.logins}"
+        self.sessions.add(session_id)
+        return 200, {"Set-Cookie": f"sessionid={session_id}; Path=/"}, b"logged in"
+
+    def _get_alerts(self, request, params) -> Response:
+        if not self._authenticated(request):
+            return self._login_redirect()
+        alerts = self.visible_alerts()
+        body = json.dumps(alerts).encode()
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            return 304, {"ETag": etag}, b""
+        return 200, {"Content-Type": "application/json", "ETag": etag}, body
+
+    def _get_thread_main_alert(self, request, params, thread_id) -> Response:
+        if not self._authenticated(request):
+            return self._login_redirect()
+        return self.json_response([{"body": f"Main alert body for {thread_id}"}])
+
+    def _dismiss(self, request, params, thread_id) -> Response:
+        if not self._authenticated(request):
+            return self._login_redirect()
+        self.dismissed.add(thread_id)
+        return self.json_response({"status": "ok"})
+
+    def _escalate(self, request, params, alert_id) -> Response:
+        if not self._authenticated(request):
+            return self._login_redirect()
+        self.escalated.add(alert_id)
+        return self.json_response({"status": "ok"})
+
+
+class TelegramStub(StubServer):
+    """Stand-in for the Telegram Bot API that records when each alert was delivered."""
+
+    ALERT_ID_PATTERN = re.compile(r"alert-\d+")
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.delivered_at: Dict[str, float] = {}
+        self.messages: List[Dict[str, str]] = []
+        self.pending_updates: List[Dict[str, Any]] = []
+        self._next_message_id = 1
+        self._next_update_id = 1
+        self.route("POST", r"/bot[^/]+/sendMessage", self._send_message, "sendMessage")
+        self.route("POST", r"/bot[^/]+/editMessageText", self._edit_message, "editMessageText")
+        self.route("POST", r"/bot[^/]+/answerCallbackQuery", self._ok, "answerCallbackQuery")
+        self.route("GET", r"/bot[^/]+/getUpdates", self._get_updates, "getUpdates")
+        self.route("POST", r"/bot[^/]+/setWebhook", self._ok, "setWebhook")
+        self.route("POST", r"/bot[^/]+/deleteWebhook", self._ok, "deleteWebhook")
+
+    def rate_limited(self) -> Response:
+        return self.json_response({"ok": False, "error_code": 429,
+                                   "parameters": {"retry_after": self.retry_after}}, status=429)
+
+    def press_button(self, action: str, thread_id: str, alert_id: str, message_id: int = 1) -> None:
+        """Queue a callback query as if a user pressed an inline button."""
+        with self._lock:
+            self.pending_updates.append({
+                "update_id": self._next_update_id,
+                "callback_query": {
+                    "id": str(self._next_update_id),
+                    "data": f"{action}:{thread_id}:{alert_id}",
+                    "from": {"id": 1},
+                    "message": {"message_id": message_id, "text": f"alert {alert_id}"},
+                },
+            })
+            self._next_update_id += 1
+
+    def _send_message(self, request, params) -> Response:
+        now = time.time()
+        with self._lock:
+            message_id = self._next_message_id
+            self._next_message_id += 1
+            self.messages.append(params)
+            for alert_id in self.ALERT_ID_PATTERN.findall(params.get("text", "")):
+                self.delivered_at.setdefault(alert_id, now)
+        return self.json_response({"ok": True, "result": {"message_id": message_id}})
+
+    def _edit_message(self, request, params) -> Response:
+        return self.json_response({"ok": True, "result": {"message_id": int(params.get("message_id", 0))}})
+
+    def _ok(self, request, params) -> Response:
+        return self.json_response({"ok": True, "result": True})
+
+    def _get_updates(self, request, params) -> Response:
+        offset = int(params.get("offset", 0))
+        deadline = time.time() + min(float(params.get("timeout", 0)), 1)
+        while True:
+            with self._lock:
+                updates = [update for update in self.pending_updates if update["update_id"] >= offset]
+            if updates or time.time() >= deadline:
+                return self.json_response({"ok": True, "result": updates})
+            time.sleep(0.01)
+
+
+class TwilioStub(StubServer):
+    """Stand-in for the Twilio Calls API."""
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.calls: List[float] = []
+        self.route("POST", r"/2010-04-01/Accounts/([^/]+)/Calls.json", self._create_call, "calls.create")
+
+    def _create_call(self, request, params, account_sid) -> Response:
+        self.calls.append(time.time())
+        return self.json_response({"sid": f"CA{len(self.calls):032d}", "account_sid": account_sid,
+                                   "status": "queued"}, status=201)
@@ -0,0 +1,79 @@
+"""Blast synthetic callback-query updates at the webhook receiver and report throughput.
+
+Usage: python -m benchmarks.webhook_load --updates 20000 --senders 8
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import http.client
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from handlers.telegram_webhook import SECRET_HEADER, TelegramWebhookServer
+
+
+def send_updates(port: int, path: str, secret: str, first_id: int, count: int) -> None:
+    """Post count updates over one keep-alive connection, as Telegram does."""
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    headers = {"Content-Type": "application/json", SECRET_HEADER: secret}
+    for update_id in range(first_id, first_id + count):
+        body = json.dumps({
+            "update_id": update_id,
+            "callback_query": {
+                "id": str(update_id),
+                "data": f"dismiss:thread-{update_id}:alert-{update_id}",
+                "from": {"id": 1},
+                "message": {"message_id": update_id, "text": "alert", "chat": {"id": 1}},
+            },
+        })
+        connection.request("POST", path, body=body, headers=headers)
+        connection.getresponse().read()
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Telegram webhook receiver load test")
+    parser.add_argument("--updates", type=int, default=20000, help="Total updates to send")
+    parser.add_argument("--senders", type=int, default=8, help="Concurrent keep-alive connections")
+    args = parser.parse_args()
+
+    server = TelegramWebhookServer(port=0, host="127.0.0.1")
+    server.start()
+    port = server._server.server_address[1]
+
+    per_sender = args.updates // args.senders
+    total = per_sender * args.senders
+    consumed = 0
+
+    def consume():
+        nonlocal consumed
+        while consumed < total:
+            consumed += len(server.get_updates(timeout=1))
+
+    consumer = threading.Thread(target=consume, daemon=True)
+    consumer.start()
+
+    started = time.perf_counter()
+    senders = [
+        threading.Thread(target=send_updates, args=(port, server.path, server.secret_token, i * per_sender, per_sender))
+        for i in range(args.senders)
+    ]
+    for sender in senders:
+        sender.start()
+    for sender in senders:
+        sender.join()
+    consumer.join(timeout=10)
+    elapsed = time.perf_counter() - started
+    server.stop()
+
+    print(f"updates: {consumed}")
+    print(f"duration_s: {elapsed:.3f}")
+    print(f"updates_per_s: {consumed / elapsed:.0f}")
+    print(f"stats: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
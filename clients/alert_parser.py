@@ -0,0 +1,117 @@
+import sys
+import json
+from typing import Any, Container, Dict, List, Optional, Union
+
+
+class Alert:
+    """The fields of an Aurora alert that the monitor uses, without the rest of the payload.
+
+    Supports alert['field'] and alert.get('field') so it can stand in for
+    the alert dicts the processors were written against. from_dict turns
+    id and threadID into strings, the form they take in the state store,
+    callback data and Telegram bookkeeping, whatever type Aurora sent.
+    """
+
+    __slots__ = ('id', 'threadID', 'customer', 'environment', 'subject', 'severity')
+
+    def __init__(self, id: Any, threadID: Any, customer: str = '', environment: str = '',
+                 subject: str = '', severity: Optional[str] = None):
+        self.id = id
+        self.threadID = threadID
+        # Customers, environments and severities repeat across thousands of alerts
+        self.customer = sys.intern(customer) if isinstance(customer, str) else customer
+        self.environment = sys.intern(environment) if isinstance(environment, str) else environment
+        self.subject = subject
+        self.severity = sys.intern(severity) if isinstance(severity, str) else severity
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Alert":
+        thread_id = data.get('threadID')
+        return cls(str(data['id']), None if thread_id is None else str(thread_id), data.get('customer', ''),
+                   data.get('environment', ''), data.get('subject', ''), data.get('severity'))
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"Alert(id={self.id!r}, threadID={self.threadID!r}, subject={self.subject!r})"
+
+
+class AlertBatch:
+    """One get_alerts payload: every alert ID present, and records for the unknown ones only.
+
+    skipped counts the array elements that were not alert objects.
+    """
+
+    __slots__ = ('ids', 'alerts', 'skipped')
+
+    def __init__(self, ids: List[Any], alerts: List[Alert], skipped: int = 0):
+        self.ids = ids
+        self.alerts = alerts
+        self.skipped = skipped
+
+
+class AlertPayloadError(ValueError):
+    """The get_alerts body is valid JSON but not an array of alerts."""
+
+
+class _KnownAlert:
+    __slots__ = ('id',)
+
+    def __init__(self, id: Any):
+        self.id = id
+
+
+def parse_alerts(payload: Union[bytes, str], known_ids: Container[Any] = ()) -> AlertBatch:
+    """Parse a get_alerts JSON array straight into Alert records.
+
+    This is not a streaming parser: the whole body is decoded at once by
+    json.loads. Its object hook reduces each object with an id and threadID
+    to an Alert that keeps only the fields in Alert.__slots__, so the
+    decoded array holds compact records rather than alert dicts. Only
+    elements of the top-level array
+    count as alerts: objects nested inside them are dropped with their
+    parent, and elements that are not alerts are skipped and counted.
+    IDs are strings, as in Alert.from_dict. Alerts whose ID is in
+    known_ids, or repeats an earlier one, only contribute their ID. Raises ValueError on invalid JSON and
+    AlertPayloadError when the payload is not an array.
+    """
+    def reduce_alert(element: Dict[str, Any]) -> Any:
+        if 'id' not in element or 'threadID' not in element:
+            return element
+        if not isinstance(element['id'], (str, int)) or isinstance(element['id'], bool):
+            # Objects, arrays, null and booleans are not alert IDs
+            return element
+        alert_id = str(element['id'])
+        if alert_id in known_ids:
+            return _KnownAlert(alert_id)
+        return Alert.from_dict(element)
+
+    elements = json.loads(payload, object_hook=reduce_alert)
+    if not isinstance(elements, list):
+        raise AlertPayloadError("Alerts payload is not a JSON array")
+
+    ids: List[Any] = []
+    alerts: List[Alert] = []
+    present = set()
+    skipped = 0
+    for element in elements:
+        if not isinstance(element, (Alert, _KnownAlert)):
+            skipped += 1
+            continue
+
+        alert_id = element.id
+        if alert_id not in present:
+            present.add(alert_id)
+            ids.append(alert_id)
+            if isinstance(element, Alert):
+                alerts.append(element)
+    return AlertBatch(ids, alerts, skipped)
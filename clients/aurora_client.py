@@ -1,23 +1,111 @@
+import re
+import time
+import hashlib
 import logging
+import threading
 import requests
-from typing import Dict, List, Optional, Tuple
-from bs4 import BeautifulSoup
+from typing import Any, Container, Dict, List, Optional, Tuple
+from clients.alert_parser import Alert, AlertBatch, AlertPayloadError, parse_alerts
+from clients.http_transport import CircuitOpenError, DeadlineExceeded, HttpTransport
 from enums import AuroraEnum
+from utils.deadline import Deadline
+
+INPUT_TAG_PATTERN = re.compile(r"<input\b[^>]*>", re.IGNORECASE)
+ATTRIBUTE_PATTERN = re.compile(r"""([\w-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+
+
+def extract_csrf_token(page: str) -> Optional[str]:
+    """Pull the csrfmiddlewaretoken value out of a login page without building a DOM."""
+    for tag in INPUT_TAG_PATTERN.finditer(page):
+        if "csrfmiddlewaretoken" not in tag.group(0):
+            continue
+        attributes = {
+            name.lower(): double or single or bare
+            for name, double, single, bare in ATTRIBUTE_PATTERN.findall(tag.group(0))
+        }
+        if attributes.get("name") == "csrfmiddlewaretoken":
+            return attributes.get("value")
+    return None
 
 
 class AuroraClient:
     """Handles communication with Aurora alert system."""
 
-    def __init__(self, base_url: str = 'https://aurora.onetick.com'):
+    def __init__(self, base_url: str = 'https://aurora.onetick.com', transport: Optional[HttpTransport] = None,
+                 max_session_age: float = 12 * 3600, refresh_margin: float = 300,
+                 login_retry_interval: float = 30, username: Optional[str] = None,
+                 password: Optional[str] = None):
         self.base_url = base_url
-        self.session = requests.Session()
+        self.username = username or AuroraEnum.AURORA_USERNAME.value
+        self.password = password or AuroraEnum.AURORA_PASSWORD.value
+        self.transport = transport or HttpTransport()
+        self.session = self.transport.session
         self.logger = logging.getLogger(self.__class__.__name__)
         self.sessionid = ''
         self.csrftoken = ''
         self.headers = {}
+        self.alerts_validators: Dict[str, str] = {}
+        self.alerts_digest = b''
+
+        self.max_session_age = max_session_age
+        self.refresh_margin = refresh_margin
+        self.login_retry_interval = login_retry_interval
+        self.session_expires_at = 0.0
+        self.session_generation = 0
+        self.last_failed_login = 0.0
+        self._login_lock = threading.Lock()
 
     def login(self) -> bool:
         """Login to Aurora system and establish session."""
+        with self._login_lock:
+            return self._login()
+
+    def _relogin(self, stale_generation: int) -> bool:
+        """Log in again unless another caller already did since stale_generation.
+
+        Concurrent callers that find the same expired session wait on one login.
+        """
+        with self._login_lock:
+            if self.session_generation != stale_generation:
+                return bool(self.headers)
+            if time.time() - self.last_failed_login < self.login_retry_interval:
+                return False
+            self.logger.info("Aurora session expired, logging in again")
+            return self._login()
+
+    def _ensure_session(self) -> None:
+        """Refresh the session shortly before its cookie expires."""
+        if self.headers and time.time() >= self.session_expires_at - self.refresh_margin:
+            self._relogin(self.session_generation)
+
+    def _is_session_expired(self, response: requests.Response) -> bool:
+        """Aurora answers an expired session with 401/403 or a redirect to the login page."""
+        if response.status_code in (401, 403):
+            return True
+        if "/alerts/login" in response.url:
+            return True
+        return any("/alerts/login" in r.headers.get("Location", "") for r in response.history)
+
+    def _get(self, url: str, endpoint: str, extra_headers: Optional[Dict[str, str]] = None,
+             deadline: Optional[Deadline] = None, **kwargs: Any) -> requests.Response:
+        """GET an Aurora API URL, re-authenticating once if the session has expired."""
+        self._ensure_session()
+        generation = self.session_generation
+        response = self.transport.get(url, endpoint=endpoint, headers={**self.headers, **(extra_headers or {})},
+                                      deadline=deadline, **kwargs)
+
+        if self._is_session_expired(response) and self._relogin(generation):
+            response = self.transport.get(url, endpoint=endpoint, headers={**self.headers, **(extra_headers or {})},
+                                          deadline=deadline, **kwargs)
+        return response
+
+    def _login(self) -> bool:
+        if not self._login_attempt():
+            self.last_failed_login = time.time()
+            return False
+        return True
+
+    def _login_attempt(self) -> bool:
         login_url = f"{self.base_url}/alerts/login/"
 
         headers = {
@@ -28,28 +116,26 @@ class AuroraClient:
 
         try:
             # Get login page to retrieve CSRF token
-            resp = self.session.get(login_url, headers=headers)
-            soup = BeautifulSoup(resp.text, 'html.parser')
-            csrf_input = soup.find("input", {"name": "csrfmiddlewaretoken"})
+            self.session.cookies.clear()
+            resp = self.transport.get(login_url, endpoint="login", headers=headers)
+            csrf_token = extract_csrf_token(resp.text)
 
-            if not csrf_input:
+            if not csrf_token:
                 self.logger.error("No CSRF token found on login page.")
                 return False
 
-            csrf_token = csrf_input["value"]
-
             # Prepare login payload
             data = {
                 "csrfmiddlewaretoken": csrf_token,
-                "username": AuroraEnum.AURORA_USERNAME.value,
-                "password": AuroraEnum.AURORA_PASSWORD.value
+                "username": self.username,
+                "password": self.password
             }
 
             self.session.headers.update(headers)
             self.session.cookies.set("csrftoken", csrf_token)
 
             # Post login data
-            response = self.session.post(login_url, data=data)
+            response = self.transport.post(login_url, endpoint="login", data=data)
 
             # Retrieve cookies
             cookies = self.session.cookies.get_dict()
@@ -62,6 +148,8 @@ class AuroraClient:
                     "Referer": f"{self.base_url}/alerts/login/",
                     "Cookie": f"csrftoken={self.csrftoken}; sessionid={self.sessionid}"
                 }
+                self.session_expires_at = self._session_cookie_expiry()
+                self.session_generation += 1
                 self.logger.info("Successfully logged in to Aurora")
                 return True
             else:
@@ -72,33 +160,83 @@ class AuroraClient:
             self.logger.error(f"Login failed: {e}")
             return False
 
-    def get_alerts(self) -> Optional[List[Dict]]:
+    def _session_cookie_expiry(self) -> float:
+        """Expiry of the sessionid cookie, or max_session_age from now if it has none."""
+        fallback = time.time() + self.max_session_age
+        for cookie in self.session.cookies:
+            if cookie.name == "sessionid" and cookie.expires:
+                return min(float(cookie.expires), fallback)
+        return fallback
+
+    def get_alerts(self) -> Optional[List[Alert]]:
         """Fetch alerts from Aurora system."""
+        modified, batch = self._fetch_alerts(conditional=False)
+        return batch.alerts if batch is not None else None
+
+    def get_alerts_if_modified(self, known_ids: Container[Any] = (),
+                               deadline: Optional[Deadline] = None) -> Tuple[bool, Optional[AlertBatch]]:
+        """Fetch alerts only if the list changed since the last call.
+
+        Returns (False, None) when the server answers 304 or the body hashes to
+        the previous payload, so the caller can skip parsing and diffing.
+        Alerts whose ID is in known_ids appear in the batch's IDs only.
+        """
+        return self._fetch_alerts(conditional=True, known_ids=known_ids, deadline=deadline)
+
+    def _fetch_alerts(self, conditional: bool, known_ids: Container[Any] = (),
+                      deadline: Optional[Deadline] = None) -> Tuple[bool, Optional[AlertBatch]]:
         if not self.headers:
             self.logger.error("Not logged in. Please login first.")
-            return None
+            return True, None
 
         url = f"{self.base_url}/alerts/get_alerts/alerts"
+        extra_headers = self.alerts_validators if conditional else None
 
         try:
             self.logger.info("Checking for new alerts...")
-            response = requests.get(url, headers=self.headers)
+            response = self._get(url, endpoint="get_alerts", extra_headers=extra_headers, deadline=deadline)
             response.raise_for_status()
 
-            data = response.json()
-            return data
-
+            if conditional and response.status_code == 304:
+                return False, None
+
+            digest = hashlib.blake2b(response.content, digest_size=16).digest()
+            if conditional and digest == self.alerts_digest:
+                return False, None
+
+            data = parse_alerts(response.content, known_ids)
+            if data.skipped:
+                self.logger.warning(f"Skipped {data.skipped} alerts payload elements without an id and threadID")
+            self.alerts_digest = digest
+            self.alerts_validators = {}
+            if response.headers.get("ETag"):
+                self.alerts_validators["If-None-Match"] = response.headers["ETag"]
+            if response.headers.get("Last-Modified"):
+                self.alerts_validators["If-Modified-Since"] = response.headers["Last-Modified"]
+            return True, data
+
+        except (DeadlineExceeded, CircuitOpenError) as e:
+            self.logger.warning(f"Skipped fetching alerts: {e}")
+            return True, None
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Error fetching alerts: {e}")
-            return None
+            return True, None
+        except AlertPayloadError as e:
+            self.logger.error(f"Unexpected alerts payload: {e}")
+            return True, None
         except ValueError:
             self.logger.error("Response is not in valid JSON format. Check Cookie...")
-            return None
+            return True, None
         except Exception as e:
             self.logger.error(f"Unexpected error fetching alerts: {e}")
-            return None
+            return True, None
+
+    def reset_alerts_cache(self) -> None:
+        """Forget the validators and digest so the next poll parses the payload again."""
+        self.alerts_validators = {}
+        self.alerts_digest = b''
 
-    def get_alert_description(self, alert_thread_id: str) -> Optional[str]:
+    def get_alert_description(self, alert_thread_id: str, deadline: Optional[Deadline] = None) -> Optional[str]:
         """Get detailed description for a specific alert."""
         if not self.headers:
             self.logger.error("Not logged in. Please login first.")
@@ -107,12 +245,15 @@ class AuroraClient:
         url = f'{self.base_url}/alerts/get_thread_main_alert/{alert_thread_id}'
 
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self._get(url, endpoint="get_thread_main_alert", deadline=deadline)
             response.raise_for_status()
 
             data = response.json()
             return data[0]['body'] if data else ""
 
+        except (DeadlineExceeded, CircuitOpenError) as e:
+            self.logger.warning(f"Skipped alert description for thread {alert_thread_id}: {e}")
+            return None
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Error fetching alert description: {e}")
             return None
@@ -132,7 +273,8 @@ class AuroraClient:
         url = f"{self.base_url}/alerts/dismiss_thread/{thread_id}"
 
         try:
-            response = requests.get(url, headers=self.headers)
+            # State-changing GET: never retried automatically
+            response = self._get(url, endpoint="dismiss_thread", idempotent=False)
             response.raise_for_status()
 
             if response.status_code == 200:
@@ -155,7 +297,7 @@ class AuroraClient:
         url = f"{self.base_url}/alerts/escalate_alert/{alert_id}/fyi/"
 
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self._get(url, endpoint="escalate_alert", idempotent=False)
             response.raise_for_status()
 
             if response.status_code == 200:
@@ -167,4 +309,8 @@ class AuroraClient:
 
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Error escalating alert {alert_id}: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def pool_stats(self) -> Dict:
+        """Return HTTP transport counters and connection pool usage."""
+        return self.transport.pool_stats()
\ No newline at end of file
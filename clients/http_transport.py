@@ -0,0 +1,355 @@
+import time
+import random
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Deque, Dict, FrozenSet, List, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from metrics.instruments import AURORA_HEDGES, AURORA_REQUEST_SECONDS, AURORA_REQUESTS
+from utils.circuit_breaker import CircuitBreaker
+from utils.deadline import Deadline
+
+# (connect, read) timeouts in seconds per Aurora endpoint
+DEFAULT_TIMEOUTS: Dict[str, Tuple[float, float]] = {
+    'default': (3.05, 15),
+    'login': (3.05, 15),
+    'get_alerts': (3.05, 20),
+    'get_thread_main_alert': (3.05, 10),
+    'dismiss_thread': (3.05, 10),
+    'escalate_alert': (3.05, 10),
+}
+
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# Read-only endpoints where a duplicate request is safe and a slow answer delays alerts
+HEDGED_ENDPOINTS = frozenset({'get_alerts', 'get_thread_main_alert'})
+# The hedge delay (a latency quantile) is recomputed once per this many samples
+HEDGE_RECOMPUTE_SAMPLES = 10
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """The caller's deadline passed before the request could complete."""
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """The endpoint's circuit breaker is open, so the request was not sent."""
+
+
+class RetryBudget:
+    """Caps retries to a fraction of recent requests so retries cannot snowball."""
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10, window: float = 60):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._window_start = time.monotonic()
+        self._requests = 0
+        self._retries = 0
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        """Count one outbound attempt against the current window."""
+        with self._lock:
+            self._roll()
+            self._requests += 1
+
+    def try_spend(self) -> bool:
+        """Reserve one retry, returning False once the budget for this window is used."""
+        with self._lock:
+            self._roll()
+            if self._retries >= self.min_retries + self.ratio * self._requests:
+                return False
+            self._retries += 1
+            return True
+
+    def _roll(self) -> None:
+        now = time.monotonic()
+        if now - self._window_start >= self.window:
+            self._window_start = now
+            self._requests = 0
+            self._retries = 0
+
+
+class HttpTransport:
+    """Shared keep-alive HTTP transport with per-endpoint timeouts and budgeted retries.
+
+    Requests can carry a Deadline that caps their timeouts, retries and
+    backoff. Each endpoint has a circuit breaker that fails requests fast
+    while the endpoint keeps failing. GETs to hedged_endpoints that run
+    past the endpoint's recent p95 latency get one duplicate request, and
+    the first answer wins; hedges are capped at a fraction of requests.
+    """
+
+    def __init__(self, pool_connections: int = 4, pool_maxsize: int = 16,
+                 timeouts: Optional[Dict[str, Tuple[float, float]]] = None,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_cap: float = 8.0,
+                 retry_budget: Optional[RetryBudget] = None, adapter: Optional[HTTPAdapter] = None,
+                 hedged_endpoints: FrozenSet[str] = HEDGED_ENDPOINTS, hedge_quantile: float = 0.95,
+                 hedge_min_samples: int = 20, hedge_budget: Optional[RetryBudget] = None,
+                 breaker_failures: int = 5, breaker_reset: float = 30):
+        self.session = requests.Session()
+        # Retries are handled here rather than by urllib3 so they can use jitter and the budget.
+        # Passing a shared adapter lets several sessions (each with its own cookies) share one pool.
+        self._owns_adapter = adapter is None
+        self.adapter = adapter or HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                              max_retries=0)
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.retry_budget = retry_budget or RetryBudget()
+        self.hedged_endpoints = hedged_endpoints
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_budget = hedge_budget or RetryBudget(ratio=0.1, min_retries=5)
+        self.breaker_failures = breaker_failures
+        self.breaker_reset = breaker_reset
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._latency_counts: Dict[str, int] = {}
+        self._hedge_delays: Dict[str, float] = {}
+        # Requests from every engine, dispatcher, paging and callback thread record latencies
+        self._latency_lock = threading.Lock()
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._pool_maxsize = pool_maxsize
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0, 'budget_exhausted': 0,
+                      'hedged': 0, 'short_circuited': 0, 'deadline_exceeded': 0}
+        self._stats_lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def get(self, url: str, endpoint: str = 'default', **kwargs: Any) -> requests.Response:
+        """Send a GET request; GETs are retried unless idempotent=False is passed."""
+        return self.request('GET', url, endpoint=endpoint, **kwargs)
+
+    def post(self, url: str, endpoint: str = 'default', **kwargs: Any) -> requests.Response:
+        """Send a POST request; POSTs are never retried."""
+        return self.request('POST', url, endpoint=endpoint, **kwargs)
+
+    def request(self, method: str, url: str, endpoint: str = 'default',
+                idempotent: Optional[bool] = None, deadline: Optional[Deadline] = None,
+                **kwargs: Any) -> requests.Response:
+        """Send a request over the pooled session, retrying idempotent calls with backoff.
+
+        Raises DeadlineExceeded once deadline has passed and CircuitOpenError
+        while the endpoint's breaker is open; both are RequestExceptions.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in ('GET', 'HEAD')
+        timeout = kwargs.pop('timeout', self.timeouts.get(endpoint, self.timeouts['default']))
+        hedge = idempotent and endpoint in self.hedged_endpoints
+        breaker = self._breaker(endpoint)
+
+        attempt = 0
+        while True:
+            if deadline is not None and deadline.expired():
+                self._count('deadline_exceeded')
+                AURORA_REQUESTS.labels(endpoint, "deadline").inc()
+                raise DeadlineExceeded(f"{endpoint}: deadline passed after {attempt} attempts")
+            if not breaker.allow():
+                self._count('short_circuited')
+                AURORA_REQUESTS.labels(endpoint, "circuit_open").inc()
+                raise CircuitOpenError(f"{endpoint}: circuit open after repeated failures")
+
+            self._count('requests')
+            self.retry_budget.record_request()
+            if hedge:
+                self.hedge_budget.record_request()
+            retry_after = None
+            attempt_timeout = deadline.clamp(timeout) if deadline is not None else timeout
+
+            try:
+                response = self._send_hedged(method, url, endpoint, hedge, deadline,
+                                             timeout=attempt_timeout, **kwargs)
+            except DeadlineExceeded:
+                # Running out of cycle time says nothing about the endpoint's health
+                breaker.release()
+                self._count('deadline_exceeded')
+                raise
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                breaker.record_failure()
+                if not self._can_retry(idempotent, attempt, deadline):
+                    self._count('failures')
+                    raise
+                self.logger.warning(f"{endpoint} attempt {attempt + 1} failed: {e}")
+            except requests.exceptions.RequestException:
+                breaker.record_failure()
+                self._count('failures')
+                raise
+            except Exception:
+                # Says nothing about the endpoint, but a half-open breaker must not keep waiting for this probe
+                breaker.release()
+                self._count('failures')
+                raise
+            else:
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if response.status_code not in RETRY_STATUSES or not self._can_retry(idempotent, attempt, deadline):
+                    return response
+                retry_after = response.headers.get('Retry-After')
+                self.logger.warning(f"{endpoint} attempt {attempt + 1} returned {response.status_code}")
+                response.close()
+
+            attempt += 1
+            self._count('retries')
+            delay = self._backoff(attempt, retry_after)
+            if deadline is not None:
+                delay = min(delay, deadline.remaining())
+            time.sleep(delay)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Return request counters and per-host connection pool usage."""
+        pools = []
+        manager = self.adapter.poolmanager
+        for key in list(manager.pools.keys()):
+            pool = manager.pools.get(key)
+            if pool is None:
+                continue
+            pools.append({
+                'host': pool.host,
+                'port': pool.port,
+                'connections_opened': pool.num_connections,
+                'requests': pool.num_requests,
+                'idle_connections': pool.pool.qsize() if pool.pool else 0,
+            })
+
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['pools'] = pools
+        stats['breakers'] = {endpoint: breaker.stats() for endpoint, breaker in self.breakers.items()}
+        return stats
+
+    def close(self) -> None:
+        """Close all pooled connections, unless the pool is shared with other transports."""
+        if self._hedge_pool:
+            self._hedge_pool.shutdown(wait=False)
+        if self._owns_adapter:
+            self.session.close()
+
+    def _breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            breaker = self.breakers.setdefault(endpoint, CircuitBreaker(self.breaker_failures, self.breaker_reset))
+        return breaker
+
+    def _send_hedged(self, method: str, url: str, endpoint: str, hedge: bool, deadline: Optional[Deadline],
+                     **kwargs: Any) -> requests.Response:
+        """Send one attempt, racing a duplicate against it if it outlives the endpoint's p95."""
+        hedge_after = self._hedge_delay(endpoint) if hedge else None
+        if hedge_after is None:
+            return self._send(method, url, endpoint, **kwargs)
+
+        pool = self._hedge_pool or self._start_hedge_pool()
+        futures = [pool.submit(self._send, method, url, endpoint, **kwargs)]
+        if deadline is not None:
+            hedge_after = min(hedge_after, deadline.remaining())
+
+        done, _ = wait(futures, timeout=hedge_after)
+        if not done and (deadline is None or not deadline.expired()) and self.hedge_budget.try_spend():
+            self._count('hedged')
+            AURORA_HEDGES.labels(endpoint).inc()
+            futures.append(pool.submit(self._send, method, url, endpoint, **kwargs))
+        return self._first_response(futures, endpoint, deadline)
+
+    def _first_response(self, futures: List[Future], endpoint: str,
+                        deadline: Optional[Deadline]) -> requests.Response:
+        """Return the first successful response; the losers are closed when they finish."""
+        pending = set(futures)
+        error: Optional[BaseException] = None
+
+        while pending:
+            done, pending = wait(pending, timeout=deadline.remaining() if deadline else None,
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.add_done_callback(self._discard)
+                    return future.result()
+                error = future.exception()
+
+        for loser in pending:
+            loser.add_done_callback(self._discard)
+        if pending or error is None:
+            raise DeadlineExceeded(f"{endpoint}: no response before the deadline")
+        raise error
+
+    @staticmethod
+    def _discard(future: Future) -> None:
+        if future.exception() is None:
+            future.result().close()
+
+    def _start_hedge_pool(self) -> ThreadPoolExecutor:
+        with self._stats_lock:
+            if self._hedge_pool is None:
+                # Every caller may have an original and a hedge in flight at once
+                self._hedge_pool = ThreadPoolExecutor(max_workers=self._pool_maxsize * 2,
+                                                      thread_name_prefix="hedge")
+        return self._hedge_pool
+
+    def _hedge_delay(self, endpoint: str) -> Optional[float]:
+        """Recent p95 latency of the endpoint, or None until enough samples exist."""
+        return self._hedge_delays.get(endpoint)
+
+    def _record_latency(self, endpoint: str, seconds: float) -> None:
+        with self._latency_lock:
+            samples = self._latencies.get(endpoint)
+            if samples is None:
+                samples = self._latencies[endpoint] = deque(maxlen=200)
+            samples.append(seconds)
+            count = self._latency_counts[endpoint] = self._latency_counts.get(endpoint, 0) + 1
+            # Recompute the quantile every few samples rather than on every request
+            if len(samples) < self.hedge_min_samples or count % HEDGE_RECOMPUTE_SAMPLES:
+                return
+            snapshot = list(samples)
+
+        snapshot.sort()
+        self._hedge_delays[endpoint] = snapshot[min(len(snapshot) - 1, int(self.hedge_quantile * len(snapshot)))]
+
+    def _send(self, method: str, url: str, endpoint: str, **kwargs: Any) -> requests.Response:
+        """Send one attempt, recording its latency and outcome."""
+        status = "error"
+        started = time.monotonic()
+        with AURORA_REQUEST_SECONDS.labels(endpoint).time():
+            try:
+                response = self.session.request(method, url, **kwargs)
+                status = str(response.status_code)
+                if response.status_code < 500:
+                    self._record_latency(endpoint, time.monotonic() - started)
+                return response
+            finally:
+                AURORA_REQUESTS.labels(endpoint, status).inc()
+
+    def _can_retry(self, idempotent: bool, attempt: int, deadline: Optional[Deadline] = None) -> bool:
+        if not idempotent or attempt >= self.max_retries:
+            return False
+        if deadline is not None and deadline.remaining() < self.backoff_base:
+            return False
+        if not self.retry_budget.try_spend():
+            self._count('budget_exhausted')
+            return False
+        return True
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than a server Retry-After."""
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), self.backoff_cap))
+            except ValueError:
+                pass
+        return delay
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
@@ -0,0 +1,82 @@
+import os
+from typing import List, Optional
+
+# Members every deployment's enums module must define
+REQUIRED_SETTINGS = {
+    'AuroraEnum': ('AURORA_USERNAME', 'AURORA_PASSWORD'),
+    'TelegramEnum': ('BOT_TOKEN', 'CHAT_ID'),
+    'TwilioEnum': ('ACCOUNT_SID', 'AUTH_TOKEN', 'PHONE_TO', 'PHONE_FROM'),
+}
+
+
+def check_configuration(tenants_path: Optional[str] = None, webhook_url: Optional[str] = None,
+                        state_directory: str = 'state', rules_path: Optional[str] = None) -> List[str]:
+    """Validate settings without importing any client or handler module.
+
+    Returns a list of problems; an empty list means the configuration is usable.
+    """
+    problems = []
+
+    try:
+        import enums
+    except ImportError as e:
+        return [f"Cannot import enums: {e}"]
+
+    for enum_name, members in REQUIRED_SETTINGS.items():
+        enum_class = getattr(enums, enum_name, None)
+        if enum_class is None:
+            problems.append(f"enums.{enum_name} is missing")
+            continue
+        for member in members:
+            if member not in enum_class.__members__:
+                problems.append(f"enums.{enum_name}.{member} is missing")
+            elif not enum_class[member].value:
+                problems.append(f"enums.{enum_name}.{member} is empty")
+
+    rules_paths = [rules_path] if rules_path else []
+    if tenants_path:
+        from config.tenant_config import load_tenants
+
+        try:
+            rules_paths.extend(tenant.rules for tenant in load_tenants(tenants_path) if tenant.rules)
+        except (OSError, ValueError, TypeError) as e:
+            problems.append(f"Invalid tenants file {tenants_path}: {e}")
+
+    for path in rules_paths:
+        problems.extend(check_rules(path))
+
+    if webhook_url and not webhook_url.startswith("https://"):
+        problems.append(f"Webhook URL must use https: {webhook_url}")
+
+    existing = state_directory
+    while existing and not os.path.exists(existing):
+        existing = os.path.dirname(existing)
+    if not os.access(existing or '.', os.W_OK):
+        problems.append(f"State directory {state_directory} is not writable")
+
+    return problems
+
+
+def check_rules(path: str) -> List[str]:
+    """Load a routing rules file and compile its patterns and templates."""
+    import re
+    from config.routing_config import MessageTemplate, load_rules
+
+    try:
+        rules = load_rules(path)
+    except (OSError, ValueError, TypeError) as e:
+        return [f"Invalid rules file {path}: {e}"]
+
+    problems = []
+    for rule in rules:
+        if rule.subject:
+            try:
+                re.compile(rule.subject)
+            except re.error as e:
+                problems.append(f"Rule {rule.name} in {path} has an invalid subject pattern: {e}")
+        if rule.template:
+            try:
+                MessageTemplate(rule.template)
+            except ValueError as e:
+                problems.append(f"Rule {rule.name} in {path} has an invalid template: {e}")
+    return problems
@@ -1,13 +1,87 @@
-import logging
 import os
-from datetime import datetime
+import gzip
+import json
+import time
+import queue
+import shutil
+import atexit
+import logging
+import logging.handlers
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+# Per-cycle messages that only need to appear occasionally in the logs
+DEFAULT_SAMPLED_MESSAGES = (
+    "Checking for new alerts...",
+    "No new alerts found",
+)
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "logger": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class RepeatedMessageFilter(logging.Filter):
+    """Lets each of the given messages through at most once per interval.
+
+    The next message that gets through reports how many copies were dropped.
+    """
+
+    def __init__(self, messages: Iterable[str], interval: float = 300):
+        super().__init__()
+        self.messages = frozenset(messages)
+        self.interval = interval
+        self._last_emitted: Dict[str, float] = {}
+        self._suppressed: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.msg not in self.messages:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_emitted.get(record.msg, float("-inf")) < self.interval:
+                self._suppressed[record.msg] = self._suppressed.get(record.msg, 0) + 1
+                return False
+
+            self._last_emitted[record.msg] = now
+            suppressed = self._suppressed.pop(record.msg, 0)
+
+        if suppressed:
+            record.msg = f"{record.msg} (suppressed {suppressed} similar)"
+        return True
 
 
 class LoggingConfig:
     """Handles logging configuration for the alert monitor."""
 
-    def __init__(self, logs_directory: str = 'logs'):
+    def __init__(self, logs_directory: str = 'logs', use_queue: bool = True,
+                 rotation: str = 'time', max_bytes: int = 50 * 1024 * 1024, backup_count: int = 30,
+                 compress: bool = True, json_format: bool = False,
+                 sampled_messages: Optional[Tuple[str, ...]] = DEFAULT_SAMPLED_MESSAGES,
+                 sample_interval: float = 300):
         self.logs_directory = logs_directory
+        self.use_queue = use_queue
+        self.rotation = rotation
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        self.json_format = json_format
+        self.sampled_messages = sampled_messages
+        self.sample_interval = sample_interval
+        self.listener: Optional[logging.handlers.QueueListener] = None
 
     def setup_logging(self) -> None:
         """Set up logging configuration with file and console handlers."""
@@ -20,14 +94,14 @@ class LoggingConfig:
         if not os.path.exists(self.logs_directory):
             os.makedirs(self.logs_directory)
 
-        today_date = datetime.now().strftime("%Y-%m-%d")
-        log_filename = os.path.join(self.logs_directory, f"log_file_{today_date}.log")
-
         # Create formatter
-        log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        if self.json_format:
+            log_formatter = JsonFormatter()
+        else:
+            log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
         # File handler
-        file_handler = logging.FileHandler(log_filename)
+        file_handler = self._create_file_handler()
         file_handler.setLevel(logging.INFO)
         file_handler.setFormatter(log_formatter)
 
@@ -36,10 +110,60 @@ class LoggingConfig:
         console_handler.setLevel(logging.INFO)
         console_handler.setFormatter(log_formatter)
 
+        handlers = [file_handler, console_handler]
+
         # Configure root logger
         root_logger.setLevel(logging.INFO)
-        root_logger.addHandler(file_handler)
-        root_logger.addHandler(console_handler)
+
+        if self.use_queue:
+            # Callers only enqueue records; a background listener does the disk and tty I/O
+            log_queue = queue.SimpleQueue()
+            queue_handler = logging.handlers.QueueHandler(log_queue)
+            self._add_sampling(queue_handler)
+            root_logger.addHandler(queue_handler)
+
+            self.listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+            self.listener.start()
+            atexit.register(self.shutdown)
+        else:
+            for handler in handlers:
+                self._add_sampling(handler)
+                root_logger.addHandler(handler)
 
         # Prevent duplicate logs
-        root_logger.propagate = False
\ No newline at end of file
+        root_logger.propagate = False
+
+    def shutdown(self) -> None:
+        """Flush queued records and stop the background listener."""
+        if self.listener:
+            self.listener.stop()
+            self.listener = None
+
+    def _add_sampling(self, handler: logging.Handler) -> None:
+        if self.sampled_messages:
+            handler.addFilter(RepeatedMessageFilter(self.sampled_messages, self.sample_interval))
+
+    def _create_file_handler(self) -> logging.Handler:
+        """Create a rotating file handler; rotated files are gzipped when compress is set."""
+        if self.rotation == 'size':
+            log_filename = os.path.join(self.logs_directory, "log_file.log")
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_filename, maxBytes=self.max_bytes, backupCount=self.backup_count)
+        elif self.rotation == 'time':
+            log_filename = os.path.join(self.logs_directory, "log_file.log")
+            file_handler = logging.handlers.TimedRotatingFileHandler(
+                log_filename, when='midnight', backupCount=self.backup_count)
+        else:
+            raise ValueError(f"Unknown log rotation: {self.rotation}")
+
+        if self.compress:
+            file_handler.namer = lambda name: f"{name}.gz"
+            file_handler.rotator = self._compress_rotated
+
+        return file_handler
+
+    @staticmethod
+    def _compress_rotated(source: str, destination: str) -> None:
+        with open(source, 'rb') as f_in, gzip.open(destination, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
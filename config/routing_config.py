@@ -0,0 +1,114 @@
+import re
+import json
+import string
+import calendar
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+MATCH_FIELDS = ('customer', 'environment', 'severity')
+
+TEMPLATE_FIELDS = frozenset(('customer', 'environment', 'subject', 'severity', 'description', 'id', 'threadID'))
+
+
+class MessageTemplate:
+    """A message template parsed once into literal and field pieces."""
+
+    def __init__(self, template: str):
+        self.pieces: List[Tuple[str, Optional[str]]] = []
+        for literal, field, format_spec, conversion in string.Formatter().parse(template):
+            if field is not None and (field not in TEMPLATE_FIELDS or format_spec or conversion):
+                raise ValueError(f"Unsupported template field {{{field}}}; use one of {sorted(TEMPLATE_FIELDS)}")
+            self.pieces.append((literal, field))
+
+    def render(self, values: Dict[str, str]) -> str:
+        return "".join(literal + values[field] if field else literal for literal, field in self.pieces)
+
+
+class RoutingRule:
+    """One alert routing rule: what it matches and what it does to matching alerts.
+
+    customer, environment and severity match exactly (case-insensitive) and may
+    list several values; subject is a case-insensitive regular expression.
+    Fields left unset match anything. A rule only applies inside its daily UTC
+    window ("HH:MM-HH:MM") and before expires_at, which makes suppression
+    windows for maintenance.
+    """
+
+    def __init__(self, name: str, customer: Any = None, environment: Any = None, severity: Any = None,
+                 subject: Optional[str] = None, suppress: bool = False, set_severity: Optional[str] = None,
+                 page: Optional[bool] = None, template: Optional[str] = None,
+                 window: Optional[str] = None, expires_at: Any = None):
+        self.name = name
+        self.customer = self._values(customer)
+        self.environment = self._values(environment)
+        self.severity = self._values(severity)
+        self.subject = subject
+        self.suppress = suppress
+        self.set_severity = set_severity.lower() if set_severity else None
+        self.page = page
+        self.template = template
+        self.window = self._parse_window(window) if window else None
+        self.expires_at = self._parse_expiry(expires_at) if expires_at is not None else None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RoutingRule":
+        if not data.get("name"):
+            raise ValueError(f"Routing rule without a name: {data}")
+        return cls(**data)
+
+    def is_active(self, now: float) -> bool:
+        """Whether the rule's window and expiry allow it to apply at time now."""
+        if self.expires_at is not None and now >= self.expires_at:
+            return False
+        if self.window is None:
+            return True
+
+        start, end = self.window
+        minute = int(now // 60) % (24 * 60)
+        if start <= end:
+            return start <= minute < end
+        # Window crosses midnight, e.g. 22:00-06:00
+        return minute >= start or minute < end
+
+    @staticmethod
+    def _values(value: Any) -> Tuple[str, ...]:
+        if value is None:
+            return ()
+        if isinstance(value, str):
+            value = [value]
+        return tuple(str(item).lower() for item in value)
+
+    @staticmethod
+    def _parse_window(window: str) -> Tuple[int, int]:
+        match = re.fullmatch(r"\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*", window)
+        if not match:
+            raise ValueError(f"Invalid rule window {window!r}, expected HH:MM-HH:MM")
+        start_hour, start_minute, end_hour, end_minute = (int(part) for part in match.groups())
+        if start_hour > 23 or end_hour > 24 or start_minute > 59 or end_minute > 59:
+            raise ValueError(f"Invalid rule window {window!r}")
+        return start_hour * 60 + start_minute, end_hour * 60 + end_minute
+
+    @staticmethod
+    def _parse_expiry(expires_at: Any) -> float:
+        """Accept epoch seconds or a UTC timestamp such as 2024-05-01T06:00:00."""
+        if isinstance(expires_at, (int, float)):
+            return float(expires_at)
+        try:
+            return float(calendar.timegm(time.strptime(expires_at.rstrip("Z"), "%Y-%m-%dT%H:%M:%S")))
+        except (AttributeError, ValueError):
+            raise ValueError(f"Invalid rule expires_at {expires_at!r}")
+
+
+def load_rules(path: str) -> List[RoutingRule]:
+    """Load routing rules from a JSON file of the form {"rules": [{...}, ...]}.
+
+    Rules are kept in file order; the first active rule that matches an alert wins.
+    """
+    with open(path) as f:
+        data = json.load(f)
+
+    rules = [RoutingRule.from_dict(entry) for entry in data.get("rules", [])]
+    names = [rule.name for rule in rules]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate rule names in {path}")
+    return rules
@@ -0,0 +1,42 @@
+import json
+from typing import Any, Dict, List, Optional
+
+
+class TenantConfig:
+    """One monitored Aurora source and where its alerts are routed.
+
+    Credentials, chat and phone number fall back to the values in enums
+    when they are not given; rules names a routing rules file for the tenant.
+    """
+
+    def __init__(self, name: str, aurora_url: str = 'https://aurora.onetick.com',
+                 aurora_username: Optional[str] = None, aurora_password: Optional[str] = None,
+                 chat_id: Optional[str] = None, phone_to: Optional[str] = None, rules: Optional[str] = None):
+        self.name = name
+        self.aurora_url = aurora_url
+        self.aurora_username = aurora_username
+        self.aurora_password = aurora_password
+        self.chat_id = chat_id
+        self.phone_to = phone_to
+        self.rules = rules
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TenantConfig":
+        if not data.get("name"):
+            raise ValueError(f"Tenant entry without a name: {data}")
+        if ":" in data["name"]:
+            # The name tags button callback data, whose fields are separated by colons
+            raise ValueError(f"Tenant name may not contain ':': {data['name']}")
+        return cls(**data)
+
+
+def load_tenants(path: str) -> List[TenantConfig]:
+    """Load tenant definitions from a JSON file of the form {"tenants": [{...}, ...]}."""
+    with open(path) as f:
+        data = json.load(f)
+
+    tenants = [TenantConfig.from_dict(entry) for entry in data.get("tenants", [])]
+    names = [tenant.name for tenant in tenants]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate tenant names in {path}")
+    return tenants
@@ -1,26 +1,77 @@
 import time
-import random
 import logging
-from typing import Optional
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from clients.aurora_client import AuroraClient
+from handlers.telegram_dispatcher import TelegramDispatcher
 from handlers.telegram_handler import TelegramHandler
+from handlers.paging_worker import PagingWorker
 from handlers.twilio_handler import TwilioHandler
+from core.poll_scheduler import AdaptivePollScheduler
+from core.shard_coordinator import ShardCoordinator
+from metrics.instruments import COLLECT_SECONDS, NEW_ALERTS, QUEUE_DEPTH
+from metrics.profiler import PROFILER
+from metrics.tracer import TRACER
 from processors.alert_processor import AlertProcessor
+from processors.alert_router import AlertRouter
+from processors.callback_executor import CallbackExecutor
+from storage.base_store import StateStore
+from storage.sqlite_store import SQLiteStateStore
+from utils.deadline import Deadline
+from utils.token_bucket import TokenBucket
+
+if TYPE_CHECKING:
+    # The receiver pulls in http.server; only webhook deployments import it
+    from handlers.telegram_webhook import TelegramWebhookServer
 
 
 class AlertMonitor:
     """Main alert monitoring class that coordinates all components."""
 
-    def __init__(self):
+    def __init__(self, aurora_client: Optional[AuroraClient] = None,
+                 telegram_handler: Optional[TelegramHandler] = None,
+                 twilio_handler: Optional[TwilioHandler] = None,
+                 state_store: Optional[StateStore] = None,
+                 description_executor: Optional[Executor] = None,
+                 telegram_rate_limiter: Optional[TokenBucket] = None,
+                 router: Optional[AlertRouter] = None,
+                 shard_coordinator: Optional[ShardCoordinator] = None,
+                 name: str = "default", cycle_budget: float = 20,
+                 handled_memory_bytes: int = 8 * 1024 * 1024):
+        self.name = name
+        self.cycle_budget = cycle_budget  # Seconds the Aurora calls of one poll cycle may take in total
         self.logger = logging.getLogger(self.__class__.__name__)
-        self.aurora_client = AuroraClient()
-        self.telegram_handler = TelegramHandler()
-        self.twilio_handler = TwilioHandler()
-        self.alert_processor = AlertProcessor(self.aurora_client, self.telegram_handler)
-
-        self.last_update_time = time.time()
+        self.state_store = state_store or SQLiteStateStore()
+        self.aurora_client = aurora_client or AuroraClient()
+        self.telegram_handler = telegram_handler or TelegramHandler(state_store=self.state_store)
+        self.twilio_handler = twilio_handler or TwilioHandler()
+        self.shard_coordinator = shard_coordinator
+        self.receiving_updates = shard_coordinator is None
+        self.alert_processor = AlertProcessor(self.aurora_client, self.telegram_handler,
+                                              state_store=self.state_store,
+                                              description_executor=description_executor,
+                                              router=router,
+                                              shard_coordinator=shard_coordinator,
+                                              handled_memory_bytes=handled_memory_bytes)
+        self.callback_executor = CallbackExecutor(self.alert_processor, self.telegram_handler)
+        self.paging_worker = PagingWorker(self.twilio_handler,
+                                          is_handled=self.alert_processor.is_alert_handled)
+        self.telegram_dispatcher = TelegramDispatcher(self.telegram_handler,
+                                                      on_sent=self.alert_processor.track_messages,
+                                                      on_dropped=self.alert_processor.forget_undelivered,
+                                                      global_bucket=telegram_rate_limiter,
+                                                      page_priority=self.paging_worker.page_priority)
+        self.alert_processor.use_dispatcher(self.telegram_dispatcher)
+
+        QUEUE_DEPTH.set_function(self.telegram_dispatcher.depth, name, "telegram_dispatch")
+        QUEUE_DEPTH.set_function(lambda: len(self.paging_worker.pending_alerts), name, "paging")
+
+        self.poll_scheduler = AdaptivePollScheduler()
         self.last_alert_time = time.time()
         self.alert_interval = 1  # Initial delay
+        self.update_poll_timeout = 25  # Upper bound for a single Telegram long poll
+        self.webhook_server: Optional['TelegramWebhookServer'] = None
+        self.webhook_url = ''
         self.is_running = False
 
     def initialize(self) -> bool:
@@ -29,28 +80,100 @@ class AlertMonitor:
             self.logger.error("Failed to login to Aurora. Cannot proceed.")
             return False
 
+        if self.shard_coordinator:
+            self.shard_coordinator.start()
+
+        if self.webhook_server:
+            self.webhook_server.start()
+            if not self.telegram_handler.set_webhook(self.webhook_url, self.webhook_server.secret_token):
+                self.logger.error("Failed to register Telegram webhook. Cannot proceed.")
+                self.webhook_server.stop()
+                return False
+
+        self.telegram_dispatcher.start()
+        self.paging_worker.start()
         self.logger.info("Alert monitor initialized successfully")
         return True
 
-    def trigger_telegram_alert(self) -> None:
-        """Check for new alerts and send notifications."""
-        new_alerts = self.alert_processor.check_new_alerts()
+    def collect_alert_messages(self) -> List[Dict[str, Any]]:
+        """Check for new alerts and format them into Telegram messages."""
+        deadline = Deadline(self.cycle_budget)
+        with PROFILER.cycle(), TRACER.span("alert_cycle", tenant=self.name), COLLECT_SECONDS.labels().time():
+            with TRACER.span("check_new_alerts"):
+                new_alerts = self.alert_processor.check_new_alerts(deadline)
+            with TRACER.span("update_resolved_messages"):
+                self.alert_processor.update_resolved_messages()
+            NEW_ALERTS.observe(len(new_alerts))
 
-        if new_alerts:
-            self.logger.info(f"Found {len(new_alerts)} new alerts")
-            alerts_messages = self.alert_processor.format_alert_messages(new_alerts)
-            self.telegram_handler.send_messages(alerts_messages)
-            self.twilio_handler.make_call()
-        else:
-            self.logger.info("No new alerts found")
+            with TRACER.span("correlate_alerts"):
+                new_alerts = self.alert_processor.correlate_alerts(new_alerts)
+                self.alert_processor.update_correlated_messages()
 
-    def process_telegram_updates(self) -> None:
-        """Process incoming Telegram updates."""
-        updates = self.telegram_handler.get_updates()
+            if not new_alerts:
+                self.logger.info("No new alerts found")
+                return []
+
+            self.logger.info(f"Found {len(new_alerts)} new alerts")
+            with TRACER.span("format_alert_messages", alerts=len(new_alerts)):
+                return self.alert_processor.format_alert_messages(new_alerts, deadline)
+
+    def trigger_telegram_alert(self) -> int:
+        """Check for new alerts, send notifications and return how many were new."""
+        alerts_messages = self.collect_alert_messages()
+
+        if alerts_messages:
+            self.telegram_dispatcher.submit(alerts_messages)
+            self.paging_worker.request_call(alerts_messages)
+
+        self.state_store.flush()
+        return len(alerts_messages)
+
+    def next_alert_interval(self, new_alerts: int) -> float:
+        """Pick the delay before the next alert check from recent activity.
+
+        Alerts with a tracked Telegram message stand in for unhandled ones:
+        dismissing, escalating or resolving an alert drops its message.
+        """
+        return self.poll_scheduler.next_interval(new_alerts, len(self.alert_processor.sent_messages))
+
+    def use_webhook(self, webhook_server: 'TelegramWebhookServer', public_url: str) -> None:
+        """Receive updates through webhook_server, registered at public_url, instead of polling."""
+        self.webhook_server = webhook_server
+        self.webhook_url = public_url
+
+    def process_telegram_updates(self, timeout: int = 0) -> int:
+        """Wait for Telegram updates and process incoming callback queries.
+
+        Updates come from the webhook queue when a webhook server is set,
+        otherwise from a getUpdates long poll. In a shard group only the
+        leader polls; the other workers just wait out the timeout.
+        """
+        if self.shard_coordinator:
+            is_leader = self.shard_coordinator.is_leader
+            if not is_leader:
+                self.receiving_updates = False
+                time.sleep(timeout)
+                return 0
+            if not self.receiving_updates:
+                # Continue from where the previous leader left off
+                self.telegram_handler.reload_offset()
+                self.receiving_updates = True
+
+        with TRACER.span("get_updates", timeout=timeout):
+            if self.webhook_server:
+                updates = self.webhook_server.get_updates(timeout)
+            else:
+                updates = self.telegram_handler.get_updates(timeout)
 
         for update in updates:
             if 'callback_query' in update:
-                self.alert_processor.handle_callback_query(update)
+                self.callback_executor.submit(update)
+
+        if updates:
+            if not self.webhook_server:
+                self.telegram_handler.save_offset()
+            self.state_store.flush()
+        return len(updates)
 
     def run(self) -> None:
         """Run the main monitoring loop."""
@@ -64,18 +187,24 @@ class AlertMonitor:
             while self.is_running:
                 current_time = time.time()
 
-                # Process Telegram updates every 3 seconds
-                if current_time - self.last_update_time >= 3:
-                    self.process_telegram_updates()
-                    self.last_update_time = current_time
-
-                # Check for alerts at random intervals
+                # Check for alerts on the adaptive schedule
                 if current_time - self.last_alert_time >= self.alert_interval:
-                    self.trigger_telegram_alert()
+                    new_alerts = self.trigger_telegram_alert()
                     self.last_alert_time = current_time
-                    self.alert_interval = random.randint(45, 75)
+                    self.alert_interval = self.next_alert_interval(new_alerts)
+
+                # Spend the time until the next alert check in a Telegram long poll
+                remaining = self.last_alert_time + self.alert_interval - time.time()
+                if remaining < 1:
+                    time.sleep(max(remaining, 0))
+                    continue
+
+                poll_started = time.time()
+                handled = self.process_telegram_updates(min(int(remaining), self.update_poll_timeout))
 
-                time.sleep(1)
+                # An empty poll that returns early means Telegram failed; back off briefly
+                if not handled and time.time() - poll_started < 1:
+                    time.sleep(1)
 
         except KeyboardInterrupt:
             self.logger.info("Alert monitor stopped by user")
@@ -87,4 +216,18 @@ class AlertMonitor:
     def stop(self) -> None:
         """Stop the monitoring loop."""
         self.is_running = False
+        if self.shard_coordinator:
+            self.shard_coordinator.stop()
+        if self.webhook_server:
+            self.telegram_handler.delete_webhook()
+            self.webhook_server.stop()
+        self.callback_executor.shutdown()
+        self.telegram_dispatcher.stop()
+        self.paging_worker.stop()
+        self.alert_processor.description_fetcher.shutdown()
+        self.logger.info(f"Aurora HTTP stats: {self.aurora_client.pool_stats()}")
+        self.logger.info(f"Detection latency upper bounds: {self.poll_scheduler.latency_stats()}")
+        self.logger.info(f"Handled registry stats: {self.alert_processor.handled_alerts.stats()}")
+        self.aurora_client.transport.close()
+        self.state_store.close()
         self.logger.info("Alert monitor stopped")
\ No newline at end of file
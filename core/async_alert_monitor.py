@@ -0,0 +1,116 @@
+import signal
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+from core.alert_monitor import AlertMonitor
+
+
+class AsyncAlertMonitor(AlertMonitor):
+    """Alert monitor that runs each path as an independent task on one event loop.
+
+    Alert polling and Telegram update processing each get their own task;
+    outgoing messages and calls go through the TelegramDispatcher and
+    PagingWorker threads. Blocking client calls run on a private thread
+    pool, so a slow dependency only delays its own path.
+    """
+
+    def __init__(self, max_workers: int = 2, **components: Any):
+        super().__init__(**components)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="engine")
+        self._stop_event: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def run(self) -> None:
+        """Run the event loop until stopped by a signal or request_stop()."""
+        try:
+            asyncio.run(self.run_async())
+        except KeyboardInterrupt:
+            self.logger.info("Alert monitor stopped by user")
+
+    async def run_async(self) -> None:
+        """Start all engine tasks and wait for a shutdown request."""
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+
+        if not await self._call(self.initialize):
+            self.executor.shutdown(wait=False)
+            return
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self._loop.add_signal_handler(sig, self._stop_event.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Not supported on this platform or outside the main thread
+
+        self.is_running = True
+        self.logger.info("Starting async alert monitor...")
+
+        self._tasks = [
+            asyncio.create_task(self._alert_poll_loop(), name="alert-poll"),
+            asyncio.create_task(self._telegram_update_loop(), name="telegram-updates"),
+        ]
+
+        try:
+            await self._stop_event.wait()
+        finally:
+            await self._shutdown()
+
+    def request_stop(self) -> None:
+        """Ask the engine to shut down; safe to call from any thread."""
+        if self._loop and self._stop_event:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+
+    async def _shutdown(self) -> None:
+        """Cancel all tasks, wait for them to unwind and release resources."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        # Threads blocked in a long poll finish on their own; don't wait for them
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.stop()
+
+    async def _call(self, func: Callable, *args: Any) -> Any:
+        """Run a blocking function on the engine thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def _alert_poll_loop(self) -> None:
+        """Poll Aurora on a deadline schedule and queue notifications."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.alert_interval
+
+        while True:
+            await asyncio.sleep(max(deadline - loop.time(), 0))
+            started = loop.time()
+
+            try:
+                messages = await self._call(self.collect_alert_messages)
+            except Exception as e:
+                self.logger.error(f"Error checking alerts: {e}")
+                messages = []
+
+            if messages:
+                self.telegram_dispatcher.submit(messages)
+                self.paging_worker.request_call(messages)
+            await self._call(self.state_store.flush)
+
+            self.alert_interval = self.next_alert_interval(len(messages))
+            deadline = started + self.alert_interval
+
+    async def _telegram_update_loop(self) -> None:
+        """Long-poll Telegram continuously and handle callback queries."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            started = loop.time()
+            try:
+                handled = await self._call(self.process_telegram_updates, self.update_poll_timeout)
+            except Exception as e:
+                self.logger.error(f"Error processing Telegram updates: {e}")
+                handled = 0
+
+            # An empty poll that returns early means Telegram failed; back off briefly
+            if not handled and loop.time() - started < 1:
+                await asyncio.sleep(1)
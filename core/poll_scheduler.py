@@ -0,0 +1,72 @@
+import time
+import random
+import logging
+from collections import deque
+from typing import Dict, Optional
+
+
+class AdaptivePollScheduler:
+    """Chooses the next Aurora poll interval from recent alert activity.
+
+    The interval halves, down to min_interval, while new or unhandled
+    alerts are present and grows by backoff_factor, up to max_interval,
+    while things are quiet. Every interval gets +/- jitter so many
+    monitors don't poll in lockstep, and is then clamped so it never drops
+    below the spacing that max_requests_per_hour allows.
+
+    Detection latency is not measured: Aurora alerts carry no timestamp the
+    monitor reads, so each new alert is charged the full gap since the
+    previous poll. The recorded figures are therefore upper bounds.
+    """
+
+    def __init__(self, min_interval: float = 10, max_interval: float = 120,
+                 initial_interval: float = 60, backoff_factor: float = 1.5,
+                 jitter: float = 0.1, max_requests_per_hour: Optional[int] = 240,
+                 latency_window: int = 1000):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.max_requests_per_hour = max_requests_per_hour
+        self.interval = initial_interval
+        self.last_poll_at: Optional[float] = None
+        self.detection_latencies = deque(maxlen=latency_window)
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def next_interval(self, new_alerts: int, unhandled_alerts: int = 0) -> float:
+        """Record the poll that just finished and return seconds until the next one.
+
+        unhandled_alerts only needs to be non-zero while alerts await a
+        response; callers may pass an approximation such as open messages.
+        """
+        now = time.time()
+        if new_alerts and self.last_poll_at is not None:
+            # An alert could have appeared at any point since the previous poll
+            self.detection_latencies.extend([now - self.last_poll_at] * new_alerts)
+        self.last_poll_at = now
+
+        if new_alerts or unhandled_alerts:
+            self.interval = max(self.min_interval, self.interval / 2)
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff_factor)
+
+        interval = self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(interval, self._budget_floor())
+
+    def latency_stats(self) -> Dict[str, float]:
+        """Return detection latency percentiles over the recent window, as upper bounds."""
+        if not self.detection_latencies:
+            return {}
+
+        latencies = sorted(self.detection_latencies)
+        return {
+            'count': len(latencies),
+            'p50': latencies[int(0.5 * (len(latencies) - 1))],
+            'p99': latencies[int(0.99 * (len(latencies) - 1))],
+            'max': latencies[-1],
+        }
+
+    def _budget_floor(self) -> float:
+        if not self.max_requests_per_hour:
+            return 0
+        return 3600 / self.max_requests_per_hour
@@ -0,0 +1,125 @@
+import os
+import math
+import time
+import socket
+import hashlib
+import logging
+import threading
+from typing import FrozenSet, List, Optional
+from storage.lease_store import LeaseStore
+
+# Pseudo-shard whose holder consumes Telegram updates for the whole group
+LEADER_SHARD = -1
+
+
+class ShardCoordinator:
+    """Splits alert ownership between cooperating workers with renewable leases.
+
+    Alerts hash by threadID onto shard_count shards. A background thread
+    heartbeats, renews this worker's leases and balances them so that each
+    live worker holds about shard_count / workers shards; leases of a dead
+    worker expire after lease_ttl and are picked up on the next tick.
+    Ownership is only trusted until the leases last renewed would expire,
+    so a stalled worker stops announcing before another one takes over.
+    """
+
+    def __init__(self, lease_store: LeaseStore, worker_id: Optional[str] = None, shard_count: int = 64,
+                 lease_ttl: float = 15, tick_interval: Optional[float] = None):
+        self.lease_store = lease_store
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.shard_count = shard_count
+        self.lease_ttl = lease_ttl
+        self.tick_interval = tick_interval or lease_ttl / 3
+        self.owned: FrozenSet[int] = frozenset()
+        self.owned_until = 0.0
+        self._leader = False
+        self.version = 0  # Bumped whenever the set of owned shards changes, or ownership lapsed
+        self.live_workers: List[str] = []
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def shard_of(self, key: str) -> int:
+        """Stable shard for a key; unlike hash(), identical in every process."""
+        digest = hashlib.blake2b(str(key).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'big') % self.shard_count
+
+    def owns(self, key: str) -> bool:
+        """Whether this worker currently owns the shard of key (a threadID)."""
+        return time.time() < self.owned_until and self.shard_of(key) in self.owned
+
+    @property
+    def is_leader(self) -> bool:
+        """Whether this worker holds the leader lease and should consume Telegram updates."""
+        return self._leader and time.time() < self.owned_until
+
+    def start(self) -> None:
+        """Take an initial share of shards, then keep leases renewed in the background."""
+        self.tick()
+        self._thread = threading.Thread(target=self._run, name="shard-coordinator", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop renewing and hand every lease back so other workers take over at once."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(self.tick_interval + 5)
+        try:
+            self.lease_store.leave(self.worker_id)
+        except Exception as e:
+            self.logger.error(f"Error releasing shard leases: {e}")
+        self.owned = frozenset()
+        self._leader = False
+
+    def tick(self) -> None:
+        """Heartbeat, renew held leases and move toward this worker's fair share."""
+        started = time.time()
+        self.live_workers = self.lease_store.heartbeat(self.worker_id, self.lease_ttl)
+        held = self.lease_store.renew(self.worker_id, self.lease_ttl)
+
+        is_leader = LEADER_SHARD in held or self.lease_store.acquire(LEADER_SHARD, self.worker_id, self.lease_ttl)
+        held.discard(LEADER_SHARD)
+
+        target = math.ceil(self.shard_count / max(len(self.live_workers), 1))
+        if len(held) > target:
+            surplus = sorted(held)[target:]
+            self.lease_store.release(surplus, self.worker_id)
+            held.difference_update(surplus)
+        elif len(held) < target:
+            held.update(self._acquire_free(target - len(held), held))
+
+        if held != self.owned:
+            self.logger.info(f"Worker {self.worker_id} owns {len(held)}/{self.shard_count} shards "
+                             f"({len(self.live_workers)} live workers)")
+            self.version += 1
+        elif held and started >= self.owned_until:
+            # Alerts that arrived while owns() was False were left to other owners; adopt them again
+            self.logger.info(f"Worker {self.worker_id} renewed its {len(held)} shards after its leases lapsed")
+            self.version += 1
+        if is_leader != self._leader:
+            self.logger.info(f"Worker {self.worker_id} {'is now' if is_leader else 'is no longer'} the leader")
+
+        self.owned = frozenset(held)
+        self._leader = is_leader
+        self.owned_until = started + self.lease_ttl
+
+    def _acquire_free(self, wanted: int, held: set) -> List[int]:
+        # Start at a worker-specific offset so workers joining together don't race for the same shards
+        offset = self.shard_of(self.worker_id)
+        acquired = []
+        for step in range(self.shard_count):
+            if len(acquired) >= wanted:
+                break
+            shard = (offset + step) % self.shard_count
+            if shard not in held and self.lease_store.acquire(shard, self.worker_id, self.lease_ttl):
+                acquired.append(shard)
+        return acquired
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.tick_interval):
+            try:
+                self.tick()
+            except Exception as e:
+                # Leases simply lapse if the store stays unreachable; owns() then turns False
+                self.logger.error(f"Error renewing shard leases: {e}")
@@ -0,0 +1,182 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set
+from requests.adapters import HTTPAdapter
+from clients.aurora_client import AuroraClient
+from clients.http_transport import HttpTransport, RetryBudget
+from config.routing_config import load_rules
+from config.tenant_config import TenantConfig
+from core.alert_monitor import AlertMonitor
+from handlers.telegram_dispatcher import GLOBAL_RATE
+from handlers.telegram_handler import TelegramHandler
+from handlers.twilio_handler import TwilioHandler
+from processors.alert_router import AlertRouter
+from storage.sqlite_store import SQLiteStateStore
+from utils.token_bucket import TokenBucket
+
+
+class MultiTenantMonitor:
+    """Monitors many Aurora sources from one process.
+
+    Each tenant gets its own AlertMonitor with isolated state and Aurora
+    session; tenants may share a Telegram chat. All tenants share one HTTP
+    connection pool, one retry budget, the description and polling worker
+    pools, and the bot-wide Telegram rate limiter. A single long poll on
+    the shared bot receives callback queries and routes them by the tenant
+    tag in their callback data.
+    """
+
+    def __init__(self, tenants: List[TenantConfig], poll_workers: int = 4, description_workers: int = 16,
+                 pool_maxsize: int = 32, state_directory: str = 'state'):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.adapter = HTTPAdapter(pool_connections=max(4, len(tenants)), pool_maxsize=pool_maxsize, max_retries=0)
+        self.retry_budget = RetryBudget()
+        self.poll_executor = ThreadPoolExecutor(max_workers=poll_workers, thread_name_prefix="tenant-poll")
+        self.description_executor = ThreadPoolExecutor(max_workers=description_workers,
+                                                       thread_name_prefix="description")
+        self.telegram_rate_limiter = TokenBucket(GLOBAL_RATE, GLOBAL_RATE)
+
+        # Bot-level state (the getUpdates offset) is shared; everything else is per tenant
+        self.state_store = SQLiteStateStore(os.path.join(state_directory, 'monitor.db'))
+        self.update_handler = TelegramHandler(state_store=self.state_store)
+
+        self.monitors: Dict[str, AlertMonitor] = {}
+        self.monitors_by_chat: Dict[str, List[AlertMonitor]] = {}
+        for tenant in tenants:
+            monitor = self._build_monitor(tenant, state_directory)
+            self.monitors[tenant.name] = monitor
+            self.monitors_by_chat.setdefault(str(monitor.telegram_handler.chat_id), []).append(monitor)
+
+        self.active: List[AlertMonitor] = []
+        self.update_poll_timeout = 25
+        self.is_running = False
+        self._in_flight: Set[str] = set()
+        self._in_flight_lock = threading.Lock()
+
+    def _build_monitor(self, tenant: TenantConfig, state_directory: str) -> AlertMonitor:
+        state_store = SQLiteStateStore(os.path.join(state_directory, f'{tenant.name}.db'))
+        transport = HttpTransport(adapter=self.adapter, retry_budget=self.retry_budget)
+        return AlertMonitor(
+            aurora_client=AuroraClient(base_url=tenant.aurora_url, transport=transport,
+                                       username=tenant.aurora_username, password=tenant.aurora_password),
+            telegram_handler=TelegramHandler(state_store=state_store, chat_id=tenant.chat_id,
+                                             callback_tag=tenant.name),
+            twilio_handler=TwilioHandler(phone_to=tenant.phone_to),
+            state_store=state_store,
+            description_executor=self.description_executor,
+            telegram_rate_limiter=self.telegram_rate_limiter,
+            router=AlertRouter(load_rules(tenant.rules)) if tenant.rules else None,
+            name=tenant.name,
+        )
+
+    def run(self) -> None:
+        """Log every tenant in and run the shared scheduling and update loop."""
+        for name, monitor in self.monitors.items():
+            if monitor.initialize():
+                self.active.append(monitor)
+            else:
+                self.logger.error(f"Tenant {name} failed to initialize and will not be monitored")
+
+        if not self.active:
+            self.logger.error("No tenant could be initialized. Cannot proceed.")
+            return
+
+        self.is_running = True
+        self.logger.info(f"Starting multi-tenant monitor for {len(self.active)} tenants...")
+
+        try:
+            while self.is_running:
+                self._schedule_due_checks()
+
+                # Long-poll until the next tenant check is due; stay responsive while checks run
+                next_due = min(monitor.last_alert_time + monitor.alert_interval for monitor in self.active)
+                remaining = next_due - time.time()
+                if self._in_flight:
+                    remaining = min(remaining, 5)
+                if remaining < 1:
+                    time.sleep(max(remaining, 0.1))
+                    continue
+
+                poll_started = time.time()
+                handled = self.process_telegram_updates(min(int(remaining), self.update_poll_timeout))
+
+                # An empty poll that returns early means Telegram failed; back off briefly
+                if not handled and time.time() - poll_started < 1:
+                    time.sleep(1)
+
+        except KeyboardInterrupt:
+            self.logger.info("Multi-tenant monitor stopped by user")
+        except Exception as e:
+            self.logger.error(f"Unexpected error in multi-tenant monitor: {e}")
+        finally:
+            self.stop()
+
+    def _schedule_due_checks(self) -> None:
+        """Hand every tenant whose check is due to the shared polling pool."""
+        now = time.time()
+        for monitor in self.active:
+            with self._in_flight_lock:
+                if monitor.name in self._in_flight or now - monitor.last_alert_time < monitor.alert_interval:
+                    continue
+                self._in_flight.add(monitor.name)
+
+            monitor.last_alert_time = now
+            future = self.poll_executor.submit(monitor.trigger_telegram_alert)
+            future.add_done_callback(lambda f, m=monitor: self._check_done(m, f))
+
+    def _check_done(self, monitor: AlertMonitor, future: Future) -> None:
+        try:
+            new_alerts = future.result()
+        except Exception as e:
+            self.logger.error(f"Tenant {monitor.name} alert check failed: {e}")
+            new_alerts = 0
+
+        monitor.alert_interval = monitor.next_alert_interval(new_alerts)
+        with self._in_flight_lock:
+            self._in_flight.discard(monitor.name)
+
+    def process_telegram_updates(self, timeout: int = 0) -> int:
+        """Long-poll the shared bot and route callback queries to the tenant that sent the message."""
+        updates = self.update_handler.get_updates(timeout)
+
+        for update in updates:
+            callback_query: Dict[str, Any] = update.get('callback_query')
+            if not callback_query:
+                continue
+
+            monitor = self._callback_monitor(callback_query)
+            if monitor is None:
+                self.logger.warning(f"Callback query for unknown tenant: {callback_query.get('data')}")
+                continue
+
+            monitor.callback_executor.submit(update)
+
+        if updates:
+            self.update_handler.save_offset()
+            self.state_store.flush()
+        return len(updates)
+
+    def _callback_monitor(self, callback_query: Dict[str, Any]) -> Optional[AlertMonitor]:
+        """The tenant named by the callback data's tag, or the only tenant in the chat for untagged buttons."""
+        parts = callback_query.get('data', '').split(":")
+        if len(parts) == 4:
+            return self.monitors.get(parts[3])
+
+        # Buttons sent before tags were added; only unambiguous in a chat with one tenant
+        chat_id = str(callback_query.get('message', {}).get('chat', {}).get('id'))
+        monitors = self.monitors_by_chat.get(chat_id, [])
+        return monitors[0] if len(monitors) == 1 else None
+
+    def stop(self) -> None:
+        """Stop every tenant and release the shared pools."""
+        self.is_running = False
+        self.poll_executor.shutdown(wait=True)
+        for monitor in self.active:
+            monitor.stop()
+        self.description_executor.shutdown(wait=False)
+        self.adapter.close()
+        self.state_store.close()
+        self.logger.info("Multi-tenant monitor stopped")
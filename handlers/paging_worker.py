@@ -0,0 +1,133 @@
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set
+from handlers.telegram_dispatcher import PRIORITY_CRITICAL, PRIORITY_TRIVIAL
+from handlers.twilio_handler import TwilioHandler
+from metrics.tracer import TRACER
+
+
+class PagingWorker:
+    """Places Twilio calls from a background thread, coalescing bursts into one call.
+
+    Only alerts at page_priority or more urgent page. A critical page is
+    placed at once; a less urgent one waits call_delay seconds. Requests
+    that arrive meanwhile fold into it. Within coalesce_window seconds of
+    the last successful call, new pages are deferred to one call when the
+    window ends. Before dialling, alerts already handled in Telegram are
+    dropped. If none are left, the call is cancelled. A failed call is
+    retried after retry_delay, doubling up to call_attempts.
+    """
+
+    def __init__(self, twilio_handler: TwilioHandler, is_handled: Optional[Callable[[str], bool]] = None,
+                 call_delay: float = 30, coalesce_window: float = 300,
+                 page_priority: int = PRIORITY_CRITICAL, retry_delay: float = 15, call_attempts: int = 4):
+        self.twilio_handler = twilio_handler
+        self.is_handled = is_handled
+        self.call_delay = call_delay
+        self.coalesce_window = coalesce_window
+        self.page_priority = page_priority
+        self.retry_delay = retry_delay
+        self.call_attempts = call_attempts
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.pending_alerts: Set[str] = set()
+        self.call_due_at: Optional[float] = None
+        self.last_call_at = 0.0
+        self.failed_attempts = 0
+        self.stats = {'requested': 0, 'coalesced': 0, 'deferred': 0, 'gated': 0, 'cancelled': 0, 'calls': 0, 'failed': 0}
+
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the background calling thread."""
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="paging-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        """Stop the calling thread, discarding any pending call."""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def request_call(self, messages: List[Dict[str, Any]]) -> None:
+        """Ask for a call about these alert messages; returns immediately."""
+        paged = [
+            message_info for message_info in messages
+            if message_info.get("alert_id") and message_info.get("page", True)
+            and message_info.get("priority", PRIORITY_TRIVIAL) <= self.page_priority
+        ]
+        alert_ids = [message_info["alert_id"] for message_info in paged]
+        critical = any(message_info.get("priority", PRIORITY_TRIVIAL) <= PRIORITY_CRITICAL for message_info in paged)
+
+        with self._condition:
+            self.stats['requested'] += 1
+            if not alert_ids:
+                self.stats['gated'] += 1
+                return
+
+            now = time.time()
+            due_at = now if critical else now + self.call_delay
+            window_end = self.last_call_at + self.coalesce_window
+            if due_at < window_end:
+                # Don't ring again straight after a call, but don't drop the page either
+                self.stats['deferred'] += 1
+                self.logger.info(f"Call for {len(alert_ids)} alerts deferred {int(window_end - now)}s "
+                                 f"to the end of the coalesce window")
+                due_at = window_end
+            if self.call_due_at is None:
+                self.call_due_at = due_at
+            else:
+                self.call_due_at = min(self.call_due_at, due_at)
+                self.stats['coalesced'] += 1
+            self.pending_alerts.update(alert_ids)
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._running and (self.call_due_at is None or self.call_due_at > time.time()):
+                    timeout = None if self.call_due_at is None else self.call_due_at - time.time()
+                    self._condition.wait(timeout)
+                if not self._running:
+                    return
+
+                alert_ids = self.pending_alerts
+                self.pending_alerts = set()
+                self.call_due_at = None
+
+            if self.is_handled:
+                alert_ids = {alert_id for alert_id in alert_ids if not self.is_handled(alert_id)}
+            if not alert_ids:
+                self.stats['cancelled'] += 1
+                self.logger.info("Pending call cancelled: every alert was already handled")
+                continue
+
+            self.stats['calls'] += 1
+            with TRACER.span("make_call", alerts=len(alert_ids)):
+                call_sid = self.twilio_handler.make_call()
+
+            with self._condition:
+                if call_sid:
+                    self.last_call_at = time.time()
+                    self.failed_attempts = 0
+                    continue
+
+                self.stats['failed'] += 1
+                self.failed_attempts += 1
+                if self.failed_attempts >= self.call_attempts:
+                    self.logger.error(f"Giving up paging for {len(alert_ids)} alerts after "
+                                      f"{self.failed_attempts} failed calls")
+                    self.failed_attempts = 0
+                    continue
+
+                # Only a successful call opens the coalesce window; retry these alerts soon
+                retry_at = time.time() + self.retry_delay * 2 ** (self.failed_attempts - 1)
+                self.pending_alerts.update(alert_ids)
+                self.call_due_at = retry_at if self.call_due_at is None else min(self.call_due_at, retry_at)
+                self.logger.warning(f"Call failed; retrying in {int(retry_at - time.time())}s")
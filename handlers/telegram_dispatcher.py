@@ -0,0 +1,249 @@
+import time
+import heapq
+import logging
+import itertools
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from handlers.telegram_handler import TelegramHandler
+from metrics.tracer import TRACER
+from utils.token_bucket import TokenBucket
+
+# Telegram allows about 30 messages/s per bot and 20 messages/min into one group
+GLOBAL_RATE = 30.0
+CHAT_RATE = 20 / 60
+CHAT_BURST = 5
+
+MAX_MESSAGE_LENGTH = 4000
+
+PRIORITY_CRITICAL = 0
+PRIORITY_TRIVIAL = 1
+
+
+class TelegramDispatcher:
+    """Rate-limited, priority-ordered outbound queue for Telegram alert messages.
+
+    A background thread sends queued messages as the per-chat and global
+    token buckets allow, honouring retry_after on 429 responses and
+    re-queueing failed sends. Edits of sent messages share the queue and
+    the buckets. When the queue grows past digest_threshold,
+    queued alerts that do not page are folded into digest messages with a
+    row of buttons per alert; critical and paged alerts are always sent on
+    their own. An alert pages when its route asks for a call and its
+    priority is at page_priority or more urgent, as in the PagingWorker.
+    """
+
+    def __init__(self, telegram_handler: TelegramHandler,
+                 on_sent: Optional[Callable[[List[Dict[str, Any]], Dict[str, int]], None]] = None,
+                 on_dropped: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+                 global_bucket: Optional[TokenBucket] = None,
+                 digest_threshold: int = 20, max_digest_items: int = 20, max_attempts: int = 5,
+                 page_priority: int = PRIORITY_CRITICAL):
+        self.telegram_handler = telegram_handler
+        self.on_sent = on_sent
+        self.on_dropped = on_dropped
+        self.global_bucket = global_bucket or TokenBucket(GLOBAL_RATE, GLOBAL_RATE)
+        self.chat_bucket = TokenBucket(CHAT_RATE, CHAT_BURST)
+        self.digest_threshold = digest_threshold
+        # Two buttons per alert, and Telegram allows 100 buttons per message
+        self.max_digest_items = min(max_digest_items, 50)
+        self.max_attempts = max_attempts
+        self.page_priority = page_priority
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._queue: List[tuple] = []
+        self._sequence = itertools.count()
+        self._latest_edits: Dict[int, int] = {}
+        self._condition = threading.Condition()
+        self._running = False
+        self._drain_until = 0.0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the background sender thread."""
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="telegram-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        """Keep sending for up to timeout seconds, then stop.
+
+        Alert messages still queued after that are passed to on_dropped, so
+        the caller can make sure they are announced after a restart.
+        """
+        with self._condition:
+            self._running = False
+            self._drain_until = time.monotonic() + timeout
+            self._condition.notify_all()
+        if self._thread:
+            # Allow for a send that is in flight when the drain time runs out
+            self._thread.join(timeout + 10)
+
+        with self._condition:
+            undelivered = [
+                member
+                for _, _, _, message_info in self._queue
+                for member in message_info.get("members") or [message_info]
+                if member.get("alert_id")
+            ]
+            self._queue = []
+        if undelivered:
+            self.logger.warning(f"{len(undelivered)} alert messages were not delivered before shutdown")
+            if self.on_dropped:
+                self.on_dropped(undelivered)
+
+    def submit(self, messages: List[Dict[str, Any]]) -> None:
+        """Queue alert messages for delivery."""
+        with self._condition:
+            for message_info in messages:
+                self._push(message_info, 0)
+            self._condition.notify()
+
+    def submit_edit(self, message_id: int, text: str, reply_markup: Optional[str] = None) -> None:
+        """Queue an edit of a sent message; reply_markup replaces its buttons, None removes them.
+
+        A later edit of the same message supersedes one still queued.
+        """
+        with self._condition:
+            sequence = next(self._sequence)
+            self._latest_edits[message_id] = sequence
+            edit_info = {"edit_message_id": message_id, "edit_sequence": sequence, "message": text,
+                         "reply_markup": reply_markup, "priority": PRIORITY_TRIVIAL, "alert_id": None}
+            heapq.heappush(self._queue, (PRIORITY_TRIVIAL, sequence, 0, edit_info))
+            self._condition.notify()
+
+    def depth(self) -> int:
+        """Number of messages waiting to be sent."""
+        return len(self._queue)
+
+    def _push(self, message_info: Dict[str, Any], attempts: int) -> None:
+        priority = message_info.get("priority", PRIORITY_TRIVIAL)
+        heapq.heappush(self._queue, (priority, next(self._sequence), attempts, message_info))
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._running and not self._queue:
+                    self._condition.wait()
+                drain_left = self._drain_until - time.monotonic()
+                if not self._running and (not self._queue or drain_left <= 0):
+                    return
+
+                if len(self._queue) > self.digest_threshold:
+                    self._fold_into_digests()
+
+                wait = max(self.global_bucket.wait_time(), self.chat_bucket.wait_time())
+                if wait > 0:
+                    self._condition.wait(wait if self._running else min(wait, drain_left))
+                    continue
+
+                self.global_bucket.consume()
+                self.chat_bucket.consume()
+                _, _, attempts, message_info = heapq.heappop(self._queue)
+
+            self._deliver(message_info, attempts)
+
+    def _deliver(self, message_info: Dict[str, Any], attempts: int) -> None:
+        if "edit_message_id" in message_info:
+            self._deliver_edit(message_info, attempts)
+            return
+
+        with TRACER.span("send_message", alert_id=message_info.get("alert_id")):
+            message_id, retry_after = self.telegram_handler.send_message(message_info)
+
+        if message_id is not None:
+            if self.on_sent:
+                # A digest is tracked as the message of every alert folded into it
+                members = message_info.get("members") or [message_info]
+                members = [member for member in members if member.get("alert_id")]
+                tracked = [{**member, "message": message_info["message"]} for member in members]
+                self.on_sent(tracked, {member["alert_id"]: message_id for member in members})
+            return
+
+        if retry_after:
+            # A 429 is about pacing, not the message, so it does not count as an attempt
+            self.chat_bucket.pause(retry_after)
+        else:
+            attempts += 1
+            if attempts >= self.max_attempts:
+                self.logger.error(f"Giving up on Telegram message for alert {message_info.get('alert_id')}")
+                if self.on_dropped:
+                    self.on_dropped([member for member in message_info.get("members") or [message_info]
+                                     if member.get("alert_id")])
+                return
+
+        with self._condition:
+            self._push(message_info, attempts)
+
+    def _deliver_edit(self, edit_info: Dict[str, Any], attempts: int) -> None:
+        message_id = edit_info["edit_message_id"]
+        with self._condition:
+            if self._latest_edits.get(message_id) != edit_info["edit_sequence"]:
+                return
+
+        with TRACER.span("edit_message", message_id=message_id):
+            edited = self.telegram_handler.edit_message(message_id, edit_info["message"],
+                                                        reply_markup=edit_info["reply_markup"])
+
+        with self._condition:
+            if not edited and attempts + 1 < self.max_attempts:
+                self._push(edit_info, attempts + 1)
+            elif self._latest_edits.get(message_id) == edit_info["edit_sequence"]:
+                del self._latest_edits[message_id]
+
+    def _fold_into_digests(self) -> None:
+        """Fold queued low-priority alerts that do not page into digest messages."""
+        kept = []
+        foldable: List[Dict[str, Any]] = []
+        fresh = 0
+        for entry in sorted(self._queue):
+            priority, _, _, message_info = entry
+            pages = message_info.get("page", True) and priority <= self.page_priority
+            if priority == PRIORITY_TRIVIAL and not pages and "edit_message_id" not in message_info:
+                # Digests already built in an earlier fold are split back into their alerts
+                foldable.extend(message_info.get("members") or [message_info])
+                fresh += "members" not in message_info
+            else:
+                kept.append(entry)
+
+        if not fresh or len(foldable) < 2:
+            return
+
+        self._queue = kept
+        heapq.heapify(self._queue)
+        digests = self._build_digests(foldable)
+        for digest in digests:
+            self._push(digest, 0)
+
+        self.logger.info(f"Folded {len(foldable)} queued alerts into {len(digests)} digest messages")
+
+    def _build_digests(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        digests = []
+        members: List[Dict[str, Any]] = []
+        length = 0
+
+        for message_info in messages:
+            summary = message_info.get("summary") or message_info["message"]
+            if members and (len(members) >= self.max_digest_items or length + len(summary) > MAX_MESSAGE_LENGTH):
+                digests.append(self._digest(members))
+                members, length = [], 0
+            members.append(message_info)
+            length += len(summary) + 5
+
+        if members:
+            digests.append(self._digest(members))
+        return digests
+
+    def _digest(self, members: List[Dict[str, Any]]) -> Dict[str, Any]:
+        lines = [
+            f"{number}. {member.get('summary') or member['message']}"
+            for number, member in enumerate(members, 1)
+        ]
+        header = f"<b>Alert digest</b> ({len(lines)} alerts)\n"
+        return {
+            "message": header + "\n".join(lines),
+            "members": members,
+            "reply_markup": self.telegram_handler.digest_keyboard(members),
+            "priority": PRIORITY_TRIVIAL,
+            "thread_id": None,
+            "alert_id": None,
+        }
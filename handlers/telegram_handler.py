@@ -1,62 +1,82 @@
 import json
 import logging
 import requests
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from handlers.base_handler import BaseHandler
+from metrics.instruments import TELEGRAM_REQUEST_SECONDS, TELEGRAM_REQUESTS
+from storage.base_store import StateStore
+from storage.memory_store import MemoryStateStore
 from enums import TelegramEnum
 
 
 class TelegramHandler(BaseHandler):
-    """Handles Telegram messaging operations."""
+    """Handles Telegram messaging operations.
 
-    def __init__(self):
+    With a callback_tag, every button's callback data ends in
+    ":<callback_tag>" so that a bot shared by several tenants can route
+    button presses to the tenant that sent the message.
+    """
+
+    def __init__(self, state_store: Optional[StateStore] = None, api_url: str = "https://api.telegram.org",
+                 chat_id: Optional[str] = None, callback_tag: Optional[str] = None):
         super().__init__()
+        self.callback_tag = callback_tag
         self.bot_token = TelegramEnum.BOT_TOKEN.value
-        self.chat_id = TelegramEnum.CHAT_ID.value
-        self.base_url = f"https://api.telegram.org/bot{self.bot_token}"
+        self.chat_id = chat_id or TelegramEnum.CHAT_ID.value
+        self.base_url = f"{api_url}/bot{self.bot_token}"
+        self.state_store = state_store or MemoryStateStore()
+        self.update_offset = self._load_offset()
+
+    def send_messages(self, messages_list: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Send multiple messages to Telegram with inline keyboards.
 
-    def send_messages(self, messages_list: List[Dict[str, Any]]) -> None:
-        """Send multiple messages to Telegram with inline keyboards."""
-        url = f"{self.base_url}/sendMessage"
+        Returns the Telegram message_id of every delivered message keyed by alert_id.
+        """
+        sent = {}
 
         for message_info in messages_list:
-            thread_id = message_info["thread_id"]
-            alert_id = message_info["alert_id"]
-
-            inline_keyboard = [
-                [
-                    {
-                        "text": "Escalate",
-                        "callback_data": f"escalate:{thread_id}:{alert_id}"
-                    },
-                    {
-                        "text": "Dismiss",
-                        "callback_data": f"dismiss:{thread_id}:{alert_id}"
-                    }
-                ]
-            ]
+            message_id, _ = self.send_message(message_info)
+            if message_id is not None:
+                sent[message_info["alert_id"]] = message_id
 
-            payload = {
-                "chat_id": self.chat_id,
-                "text": message_info["message"],
-                "parse_mode": "HTML",
-                "reply_markup": json.dumps({
-                    "inline_keyboard": inline_keyboard
-                })
-            }
+        return sent
 
-            try:
-                response = requests.post(url, data=payload)
-                if response.status_code == 200:
-                    self.logger.info("Message sent to Telegram!")
-                else:
-                    self.logger.error("Failed to send message: %s", response.status_code)
-            except requests.exceptions.RequestException as e:
-                self.logger.error(f"Error sending Telegram message: {e}")
+    def send_message(self, message_info: Dict[str, Any]) -> Tuple[Optional[int], float]:
+        """Send one alert message, with action buttons if it belongs to a single alert.
+
+        Returns (message_id, retry_after): message_id is None on failure, and
+        retry_after is the back-off Telegram asked for on a 429, otherwise 0.
+        """
+        payload = {
+            "chat_id": self.chat_id,
+            "text": message_info["message"],
+            "parse_mode": "HTML"
+        }
+
+        if message_info.get("reply_markup"):
+            payload["reply_markup"] = message_info["reply_markup"]
+        elif message_info.get("alert_id"):
+            payload["reply_markup"] = self.alert_keyboard(message_info["thread_id"], message_info["alert_id"])
+
+        try:
+            response = self._request("POST", "sendMessage", data=payload, timeout=10)
+            if response.status_code == 200:
+                self.logger.info("Message sent to Telegram!")
+                return response.json().get("result", {}).get("message_id"), 0
+            if response.status_code == 429:
+                retry_after = response.json().get("parameters", {}).get("retry_after", 1)
+                self.logger.warning(f"Telegram rate limit hit, retry after {retry_after}s")
+                return None, float(retry_after)
+            self.logger.error("Failed to send message: %s", response.status_code)
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Error sending Telegram message: {e}")
+        except ValueError:
+            self.logger.error("Telegram sendMessage response is not valid JSON")
+
+        return None, 0
 
     def send_error_message(self, message: str) -> None:
         """Send error message to Telegram."""
-        url = f"{self.base_url}/sendMessage"
         payload = {
             "chat_id": self.chat_id,
             "text": message,
@@ -64,7 +84,7 @@ class TelegramHandler(BaseHandler):
         }
 
         try:
-            response = requests.post(url, data=payload)
+            response = self._request("POST", "sendMessage", data=payload, timeout=10)
             if response.status_code == 200:
                 self.logger.info("Error message sent to Telegram!")
             else:
@@ -72,22 +92,134 @@ class TelegramHandler(BaseHandler):
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Error sending Telegram error message: {e}")
 
-    def get_updates(self) -> List[Dict[str, Any]]:
-        """Get updates from Telegram."""
-        url = f"{self.base_url}/getUpdates"
+    def get_updates(self, timeout: int = 0) -> List[Dict[str, Any]]:
+        """Long-poll Telegram for callback queries newer than the last seen update."""
+        params = {
+            "timeout": timeout,
+            "allowed_updates": json.dumps(["callback_query"])
+        }
+        if self.update_offset:
+            params["offset"] = self.update_offset
 
         try:
-            response = requests.get(url)
+            # Leave headroom over the server-side timeout before giving up on the socket
+            response = self._request("GET", "getUpdates", params=params, timeout=timeout + 10)
             response.raise_for_status()
-            return response.json().get('result', [])
+            updates = response.json().get('result', [])
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Error getting updates: {e}")
             return []
+        except ValueError:
+            self.logger.error("Telegram updates response is not valid JSON")
+            return []
+
+        if updates:
+            # Telegram drops everything below the offset on the next getUpdates call
+            self.update_offset = updates[-1]['update_id'] + 1
+        return updates
 
-    def edit_message(self, message_id: int, text: str, remove_buttons: bool = True) -> bool:
-        """Edit an existing message."""
-        url = f"{self.base_url}/editMessageText"
+    def answer_callback_query(self, callback_query_id: str, text: Optional[str] = None) -> bool:
+        """Stop the button's loading spinner, optionally showing a short notice."""
+        payload = {"callback_query_id": callback_query_id}
+        if text:
+            payload["text"] = text
 
+        try:
+            response = self._request("POST", "answerCallbackQuery", data=payload, timeout=10)
+            return response.status_code == 200
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Error answering callback query: {e}")
+            return False
+
+    def set_webhook(self, url: str, secret_token: str) -> bool:
+        """Register a webhook so Telegram pushes callback queries instead of being polled."""
+        payload = {
+            "url": url,
+            "secret_token": secret_token,
+            "allowed_updates": json.dumps(["callback_query"])
+        }
+
+        try:
+            response = self._request("POST", "setWebhook", data=payload, timeout=10)
+            if response.status_code == 200:
+                self.logger.info(f"Telegram webhook set to {url}")
+                return True
+            self.logger.error(f"Failed to set webhook. Status: {response.status_code}")
+            return False
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Error setting webhook: {e}")
+            return False
+
+    def delete_webhook(self) -> bool:
+        """Remove the webhook so getUpdates polling works again."""
+        try:
+            response = self._request("POST", "deleteWebhook", timeout=10)
+            return response.status_code == 200
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Error deleting webhook: {e}")
+            return False
+
+    def save_offset(self) -> None:
+        """Persist the next update offset so a restart does not replay handled updates."""
+        self.state_store.set_value('telegram_offset', str(self.update_offset))
+
+    def reload_offset(self) -> None:
+        """Pick up the offset another process saved, e.g. when taking over update polling."""
+        self.update_offset = self._load_offset()
+
+    def _load_offset(self) -> int:
+        """Load the persisted update offset, starting from 0 if there is none."""
+        try:
+            return int(self.state_store.get_value('telegram_offset', '0'))
+        except ValueError as e:
+            self.logger.error(f"Error loading Telegram update offset: {e}")
+            return 0
+
+    def callback_data(self, action: str, thread_id: str, alert_id: str) -> str:
+        """Callback data for an alert button: action:thread_id:alert_id[:callback_tag]."""
+        data = f"{action}:{thread_id}:{alert_id}"
+        return f"{data}:{self.callback_tag}" if self.callback_tag else data
+
+    def alert_keyboard(self, thread_id: str, alert_id: str) -> str:
+        """Reply markup with the Escalate and Dismiss buttons for an alert."""
+        inline_keyboard = [
+            [
+                {
+                    "text": "Escalate",
+                    "callback_data": self.callback_data("escalate", thread_id, alert_id)
+                },
+                {
+                    "text": "Dismiss",
+                    "callback_data": self.callback_data("dismiss", thread_id, alert_id)
+                }
+            ]
+        ]
+        return json.dumps({
+            "inline_keyboard": inline_keyboard
+        })
+
+    def digest_keyboard(self, members: List[Dict[str, Any]]) -> str:
+        """Reply markup with a numbered Escalate/Dismiss row for each alert in a digest."""
+        inline_keyboard = [
+            [
+                {
+                    "text": f"Escalate {number}",
+                    "callback_data": self.callback_data("escalate", member['thread_id'], member['alert_id'])
+                },
+                {
+                    "text": f"Dismiss {number}",
+                    "callback_data": self.callback_data("dismiss", member['thread_id'], member['alert_id'])
+                }
+            ]
+            for number, member in enumerate(members, 1)
+        ]
+        return json.dumps({
+            "inline_keyboard": inline_keyboard
+        })
+
+    def edit_message(self, message_id: int, text: str, remove_buttons: bool = True,
+                     reply_markup: Optional[str] = None) -> bool:
+        """Edit an existing message; reply_markup replaces its buttons."""
         inline_keyboard = [] if remove_buttons else None
         payload = {
             "chat_id": self.chat_id,
@@ -96,11 +228,13 @@ class TelegramHandler(BaseHandler):
             "parse_mode": "HTML"
         }
 
-        if inline_keyboard is not None:
+        if reply_markup is not None:
+            payload["reply_markup"] = reply_markup
+        elif inline_keyboard is not None:
             payload["reply_markup"] = json.dumps({"inline_keyboard": inline_keyboard})
 
         try:
-            response = requests.post(url, data=payload)
+            response = self._request("POST", "editMessageText", data=payload, timeout=10)
             if response.status_code == 200:
                 self.logger.info(f"Message {message_id} edited successfully")
                 return True
@@ -111,6 +245,17 @@ class TelegramHandler(BaseHandler):
             self.logger.error(f"Error editing message: {e}")
             return False
 
+    def _request(self, http_method: str, api_method: str, **kwargs: Any) -> requests.Response:
+        """Call a Bot API method, recording its latency and outcome."""
+        status = "error"
+        with TELEGRAM_REQUEST_SECONDS.labels(api_method).time():
+            try:
+                response = requests.request(http_method, f"{self.base_url}/{api_method}", **kwargs)
+                status = str(response.status_code)
+                return response
+            finally:
+                TELEGRAM_REQUESTS.labels(api_method, status).inc()
+
     def handle(self, action: str, *args, **kwargs) -> Any:
         """Handle different Telegram operations."""
         if action == "send_messages":
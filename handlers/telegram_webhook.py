@@ -0,0 +1,131 @@
+import hmac
+import json
+import queue
+import logging
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+# Telegram updates are a few KiB; anything far larger is not from Telegram
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class TelegramWebhookServer:
+    """Embedded HTTP receiver for Telegram webhook updates.
+
+    Requests must carry the secret token registered with setWebhook, and
+    are rejected before their body is read otherwise. Bodies over
+    max_body_bytes get a 413. Callback queries are put on an internal
+    queue and everything else is acknowledged and dropped. Connections are kept alive, so Telegram can
+    reuse them instead of reconnecting for every update.
+    """
+
+    def __init__(self, port: int = 8443, host: str = "0.0.0.0", path: str = "/telegram/webhook",
+                 secret_token: Optional[str] = None, max_queue: int = 100000,
+                 max_body_bytes: int = MAX_BODY_BYTES):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.secret_token = secret_token or secrets.token_urlsafe(32)
+        self.max_body_bytes = max_body_bytes
+        self.updates: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self.stats = {'received': 0, 'queued': 0, 'rejected': 0, 'dropped': 0}
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def address(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{self.path}"
+
+    def start(self) -> None:
+        """Start serving on a background thread."""
+        webhook = self
+        secret = self.secret_token.encode()
+
+        class WebhookHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                webhook.stats['received'] += 1
+
+                token = self.headers.get(SECRET_HEADER, "").encode()
+                if self.path != webhook.path or not hmac.compare_digest(token, secret):
+                    self._reject(403)
+                    return
+
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                except ValueError:
+                    self._reject(400)
+                    return
+                if length < 0:
+                    self._reject(400)
+                    return
+                if length > webhook.max_body_bytes:
+                    self._reject(413)
+                    return
+
+                try:
+                    update = json.loads(self.rfile.read(length))
+                except ValueError:
+                    self._reject(400)
+                    return
+                if not isinstance(update, dict):
+                    self._reject(400)
+                    return
+
+                if 'callback_query' in update:
+                    webhook.enqueue(update)
+                self._reply(200)
+
+            def _reject(self, status: int) -> None:
+                webhook.stats['rejected'] += 1
+                # The body may be left unread, so the connection cannot carry another request
+                self.close_connection = True
+                self._reply(status)
+
+            def _reply(self, status: int) -> None:
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                if self.close_connection:
+                    self.send_header("Connection", "close")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), WebhookHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="telegram-webhook", daemon=True).start()
+        self.logger.info(f"Receiving Telegram webhooks on {self.address}")
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def enqueue(self, update: Dict[str, Any]) -> None:
+        try:
+            self.updates.put_nowait(update)
+            self.stats['queued'] += 1
+        except queue.Full:
+            # Telegram does not retry a 200, but a full queue means the consumer is stuck anyway
+            self.stats['dropped'] += 1
+            self.logger.error("Webhook update queue is full, dropping update")
+
+    def get_updates(self, timeout: float = 0) -> List[Dict[str, Any]]:
+        """Wait up to timeout seconds for an update, then drain whatever else is queued."""
+        try:
+            updates = [self.updates.get(timeout=timeout) if timeout > 0 else self.updates.get_nowait()]
+        except queue.Empty:
+            return []
+
+        while True:
+            try:
+                updates.append(self.updates.get_nowait())
+            except queue.Empty:
+                return updates
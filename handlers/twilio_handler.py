@@ -1,31 +1,47 @@
 import logging
-from twilio.rest import Client
+from typing import Any, Optional
 from handlers.base_handler import BaseHandler
+from metrics.instruments import TWILIO_CALL_SECONDS, TWILIO_CALLS
 from enums import TwilioEnum
 
 
 class TwilioHandler(BaseHandler):
     """Handles Twilio phone call operations."""
 
-    def __init__(self):
+    def __init__(self, api_url: Optional[str] = None, phone_to: Optional[str] = None):
         super().__init__()
         self.account_sid = TwilioEnum.ACCOUNT_SID.value
         self.auth_token = TwilioEnum.AUTH_TOKEN.value
-        self.phone_to = TwilioEnum.PHONE_TO.value
+        self.phone_to = phone_to or TwilioEnum.PHONE_TO.value
         self.phone_from = TwilioEnum.PHONE_FROM.value
-        self.client = Client(self.account_sid, self.auth_token)
+        self.api_url = api_url
+        self._client = None
+
+    @property
+    def client(self) -> Any:
+        """Twilio REST client, created on first use so the SDK import stays off the startup path."""
+        if self._client is None:
+            from twilio.rest import Client
+
+            self._client = Client(self.account_sid, self.auth_token)
+            if self.api_url:
+                self._client.api.base_url = self.api_url
+        return self._client
 
     def make_call(self, message: str = "Alert! Something is wrong on the server!") -> str:
         """Make a phone call with the specified message."""
         try:
-            call_result = self.client.calls.create(
-                twiml=f'<Response><Say>{message}</Say></Response>',
-                to=self.phone_to,
-                from_=self.phone_from
-            )
+            with TWILIO_CALL_SECONDS.labels().time():
+                call_result = self.client.calls.create(
+                    twiml=f'<Response><Say>{message}</Say></Response>',
+                    to=self.phone_to,
+                    from_=self.phone_from
+                )
+            TWILIO_CALLS.labels("ok").inc()
             self.logger.warning(f"Call initiated: {call_result.sid}")
             return call_result.sid
         except Exception as e:
+            TWILIO_CALLS.labels("error").inc()
             self.logger.error(f"Error making call: {e}")
             return ""
 
@@ -1,23 +1,163 @@
 import sys
 import os
+import argparse
 
 # Add the parent directory to Python path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from config.logging_config import LoggingConfig
-from core.alert_monitor import AlertMonitor
 
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Aurora alert monitor")
+    parser.add_argument("--engine", choices=["sync", "async"], default="sync",
+                        help="Monitoring engine: the sequential loop or the asyncio task engine")
+    parser.add_argument("--metrics-port", type=int, default=0,
+                        help="Serve Prometheus metrics on this local port (0 disables)")
+    parser.add_argument("--tenants", metavar="PATH",
+                        help="JSON file of tenants to monitor from this one process")
+    parser.add_argument("--rules", metavar="PATH", help="JSON file of alert routing rules (tenants name their own in the tenants file)")
+    parser.add_argument("--webhook-url", help="Public HTTPS URL that Telegram should post updates to")
+    parser.add_argument("--webhook-port", type=int, default=8443, help="Local port for the webhook receiver")
+    parser.add_argument("--log-json", action="store_true", help="Write logs as JSON lines")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Run this many sharded worker processes that split alerts between them")
+    parser.add_argument("--sharded", action="store_true",
+                        help="Join a shard group, e.g. of processes on other hosts sharing --lease-path")
+    parser.add_argument("--lease-path", default=os.path.join("state", "leases.db"),
+                        help="Shard lease store: a SQLite file (*.db) or a directory on a shared filesystem")
+    parser.add_argument("--shard-count", type=int, default=64, help="Shards that alert threads hash onto")
+    parser.add_argument("--diagnostics-dir", default="diagnostics",
+                        help="Where SIGUSR1 writes span traces and SIGUSR2 writes cycle profiles")
+    parser.add_argument("--profile-cycles", type=int, default=10,
+                        help="Alert cycles to profile after SIGUSR2")
+    parser.add_argument("--check", action="store_true",
+                        help="Validate configuration and exit without starting the monitor")
+    return parser.parse_args()
 
-def main():
-    """Main function to run the alert monitor."""
-    # Setup logging
-    logging_config = LoggingConfig()
+
+def check(args) -> int:
+    """Validate configuration without importing clients or handlers; return the exit code."""
+    from config.config_check import check_configuration
+
+    problems = check_configuration(tenants_path=args.tenants, webhook_url=args.webhook_url,
+                                   rules_path=args.rules)
+    for problem in problems:
+        print(f"ERROR: {problem}")
+    if not problems:
+        print("Configuration OK")
+    return 1 if problems else 0
+
+
+def create_shard_coordinator(args):
+    """Build the shard coordinator on the lease store that --lease-path names."""
+    from core.shard_coordinator import ShardCoordinator
+
+    if args.lease_path.endswith(".db"):
+        from storage.sqlite_lease_store import SQLiteLeaseStore
+
+        lease_store = SQLiteLeaseStore(args.lease_path)
+    else:
+        from storage.file_lease_store import FileLeaseStore
+
+        lease_store = FileLeaseStore(args.lease_path)
+    return ShardCoordinator(lease_store, shard_count=args.shard_count)
+
+
+def create_monitor(args):
+    """Build the requested monitor, importing only the engine that is used."""
+    if args.tenants:
+        from config.tenant_config import load_tenants
+        from core.tenant_monitor import MultiTenantMonitor
+
+        return MultiTenantMonitor(load_tenants(args.tenants))
+
+    components = {}
+    if args.rules:
+        from config.routing_config import load_rules
+        from processors.alert_router import AlertRouter
+
+        components["router"] = AlertRouter(load_rules(args.rules))
+
+    if args.sharded or args.workers > 1:
+        components["shard_coordinator"] = create_shard_coordinator(args)
+
+    if args.engine == "async":
+        from core.async_alert_monitor import AsyncAlertMonitor
+
+        monitor = AsyncAlertMonitor(**components)
+    else:
+        from core.alert_monitor import AlertMonitor
+
+        monitor = AlertMonitor(**components)
+
+    if args.webhook_url:
+        from handlers.telegram_webhook import TelegramWebhookServer
+
+        monitor.use_webhook(TelegramWebhookServer(port=args.webhook_port), args.webhook_url)
+    return monitor
+
+
+def run_worker(args, worker_index=None):
+    """Set up logging and metrics for one process and run its monitor."""
+    from config.logging_config import LoggingConfig
+
+    # Setup logging; sharded workers each rotate their own log directory
+    logs_directory = 'logs' if worker_index is None else os.path.join('logs', f'worker-{worker_index}')
+    logging_config = LoggingConfig(logs_directory=logs_directory, json_format=args.log_json)
     logging_config.setup_logging()
 
+    from metrics.diagnostics import install_signal_handlers
+
+    install_signal_handlers(args.diagnostics_dir, args.profile_cycles)
+
+    if args.metrics_port:
+        from metrics.exporter import MetricsServer
+
+        MetricsServer(args.metrics_port + (worker_index or 0)).start()
+
     # Create and run the alert monitor
-    monitor = AlertMonitor()
+    monitor = create_monitor(args)
     monitor.run()
 
 
+def run_workers(args):
+    """Start args.workers sharded monitor processes and wait for them to exit."""
+    import multiprocessing
+
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(args, index), name=f"monitor-worker-{index}")
+        for index in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        # The workers got the same SIGINT and release their leases on the way out
+        for worker in workers:
+            worker.join()
+
+
+def main():
+    """Main function to run the alert monitor."""
+    args = parse_args()
+
+    if args.check:
+        sys.exit(check(args))
+
+    if (args.sharded or args.workers > 1) and (args.tenants or args.webhook_url):
+        sys.exit("Sharded mode supports neither --tenants nor --webhook-url")
+
+    if args.tenants and (args.engine != "sync" or args.webhook_url or args.rules):
+        sys.exit("--tenants supports neither --engine async, --webhook-url nor --rules (set rules per tenant)")
+
+    if args.workers > 1:
+        run_workers(args)
+    else:
+        run_worker(args)
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
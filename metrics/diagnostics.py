@@ -0,0 +1,45 @@
+import signal
+import logging
+import threading
+from metrics.profiler import PROFILER, CycleProfiler
+from metrics.tracer import TRACER, SpanTracer
+
+logger = logging.getLogger(__name__)
+
+
+def install_signal_handlers(directory: str = "diagnostics", profile_cycles: int = 10,
+                            tracer: SpanTracer = TRACER, profiler: CycleProfiler = PROFILER) -> bool:
+    """Dump the span timeline on SIGUSR1 and toggle cycle profiling on SIGUSR2.
+
+    Both files go to directory. The handlers only set flags: a helper
+    thread writes the trace, and the profiler starts or stops with the
+    next cycle, so no I/O or locking runs inside a signal handler.
+    Returns False where the signals do not exist (Windows) or when not
+    called from the main thread.
+    """
+    if not hasattr(signal, "SIGUSR1") or threading.current_thread() is not threading.main_thread():
+        return False
+
+    profiler.directory = directory
+    profiler.cycles = profile_cycles
+    dump_requested = threading.Event()
+
+    def dump_traces():
+        while True:
+            dump_requested.wait()
+            dump_requested.clear()
+            try:
+                logger.info(f"Wrote span trace to {tracer.dump(directory)}")
+            except OSError as e:
+                logger.error(f"Error writing span trace: {e}")
+
+    def request_dump(signum, frame):
+        dump_requested.set()
+
+    def toggle_profiling(signum, frame):
+        profiler.toggle()
+
+    threading.Thread(target=dump_traces, name="trace-dumper", daemon=True).start()
+    signal.signal(signal.SIGUSR1, request_dump)
+    signal.signal(signal.SIGUSR2, toggle_profiling)
+    return True
@@ -0,0 +1,25 @@
+from metrics.registry import REGISTRY
+
+AURORA_REQUEST_SECONDS = REGISTRY.histogram(
+    "aurora_request_seconds", "Latency of Aurora HTTP requests", ["endpoint"])
+AURORA_REQUESTS = REGISTRY.counter(
+    "aurora_requests_total", "Aurora HTTP requests by endpoint and status", ["endpoint", "status"])
+AURORA_HEDGES = REGISTRY.counter(
+    "aurora_hedged_requests_total", "Duplicate Aurora requests sent because the first was slow", ["endpoint"])
+
+TELEGRAM_REQUEST_SECONDS = REGISTRY.histogram(
+    "telegram_request_seconds", "Latency of Telegram Bot API requests", ["method"])
+TELEGRAM_REQUESTS = REGISTRY.counter(
+    "telegram_requests_total", "Telegram Bot API requests by method and status", ["method", "status"])
+
+TWILIO_CALL_SECONDS = REGISTRY.histogram(
+    "twilio_call_seconds", "Latency of Twilio call creation")
+TWILIO_CALLS = REGISTRY.counter(
+    "twilio_calls_total", "Twilio call attempts by status", ["status"])
+
+COLLECT_SECONDS = REGISTRY.histogram(
+    "monitor_collect_seconds", "Time to fetch, diff and format one poll's alerts, not sending them")
+NEW_ALERTS = REGISTRY.histogram(
+    "monitor_new_alerts", "New alerts found per poll", buckets=(0, 1, 5, 10, 50, 100, 500, 1000, 5000))
+QUEUE_DEPTH = REGISTRY.gauge(
+    "monitor_queue_depth", "Items waiting in internal queues", ["tenant", "queue"])
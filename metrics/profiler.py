@@ -0,0 +1,109 @@
+import os
+import time
+import itertools
+import logging
+import threading
+from typing import Any, Optional
+
+
+class _ProfiledCycle:
+    __slots__ = ("profiler", "profile")
+
+    def __init__(self, profiler: "CycleProfiler", profile: Any):
+        self.profiler = profiler
+        self.profile = profile
+
+    def __enter__(self) -> "_ProfiledCycle":
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.profile.disable()
+        self.profiler._end_cycle()
+
+
+class _Unprofiled:
+    __slots__ = ()
+
+    def __enter__(self) -> "_Unprofiled":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_UNPROFILED = _Unprofiled()
+
+
+class CycleProfiler:
+    """Runs cProfile over the next few alert cycles on request.
+
+    toggle() is safe to call from a signal handler: it only flips state,
+    and profiling starts with the next cycle(). After cycles profiled
+    cycles, or a second toggle(), the stats are written to directory as a
+    .prof file for pstats or snakeviz. Until then cycle() costs one
+    attribute check.
+
+    cProfile only sees the thread that runs the cycle. Work handed to the
+    description fetcher pool, the Telegram dispatcher or the paging worker
+    shows up as time spent waiting on it; the span trace covers those
+    threads.
+    """
+
+    def __init__(self, directory: str = "diagnostics", cycles: int = 10):
+        self.directory = directory
+        self.cycles = cycles
+        self.requested = False
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._profile: Optional[Any] = None
+        self._remaining = 0
+        self._sequence = itertools.count(1)
+        # Profile one thread at a time; in multi-tenant mode cycles run on several
+        self._lock = threading.Lock()
+
+    def toggle(self) -> None:
+        """Start profiling the next cycles, or stop a session that is running."""
+        self.requested = not self.requested
+
+    def cycle(self):
+        """Context manager around one alert cycle; profiles it while a session is requested."""
+        if not self.requested and self._profile is None:
+            return _UNPROFILED
+        if not self._lock.acquire(blocking=False):
+            return _UNPROFILED
+
+        if not self.requested:
+            self._finish()
+            self._lock.release()
+            return _UNPROFILED
+        if self._profile is None:
+            import cProfile
+
+            self._profile = cProfile.Profile()
+            self._remaining = self.cycles
+            self.logger.info(f"Profiling the next {self.cycles} alert cycles of thread "
+                             f"{threading.current_thread().name}")
+        return _ProfiledCycle(self, self._profile)
+
+    def _end_cycle(self) -> None:
+        self._remaining -= 1
+        if self._remaining <= 0:
+            self.requested = False
+            self._finish()
+        self._lock.release()
+
+    def _finish(self) -> None:
+        profile, self._profile = self._profile, None
+        if profile is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            name = f"profile-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}-{next(self._sequence)}.prof"
+            path = os.path.join(self.directory, name)
+            profile.dump_stats(path)
+            self.logger.info(f"Wrote cycle profile to {path}")
+        except OSError as e:
+            self.logger.error(f"Error writing cycle profile: {e}")
+
+
+PROFILER = CycleProfiler()
@@ -0,0 +1,91 @@
+import os
+import json
+import time
+import itertools
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# (name, start ns, duration ns, thread ident, args)
+SpanRecord = Tuple[str, int, int, int, Optional[Dict[str, Any]]]
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "started")
+
+    def __init__(self, tracer: "SpanTracer", name: str, args: Optional[Dict[str, Any]]):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self) -> "_Span":
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        ended = time.perf_counter_ns()
+        # deque.append is atomic, so spans from any thread need no lock
+        self.tracer.spans.append((self.name, self.started, ended - self.started, threading.get_ident(), self.args))
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class SpanTracer:
+    """Records timed spans of the monitor's stages into a fixed-size ring buffer.
+
+    A span costs two clock reads and a deque append, so the tracer stays on
+    in production and always holds the last capacity spans. dump() writes
+    them as Chrome trace JSON, viewable in chrome://tracing or Perfetto.
+    """
+
+    def __init__(self, capacity: int = 8192, enabled: bool = True):
+        self.enabled = enabled
+        self.spans: Deque[SpanRecord] = deque(maxlen=capacity)
+        self._sequence = itertools.count(1)
+
+    def span(self, name: str, **args: Any):
+        """Context manager timing the enclosed block as one span named name."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args or None)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """The recorded spans as a Chrome trace event document."""
+        pid = os.getpid()
+        spans = list(self.spans)
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+        events: List[Dict[str, Any]] = []
+        for tid in {span[3] for span in spans}:
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                           "args": {"name": thread_names.get(tid, f"thread-{tid}")}})
+        for name, started, duration, tid, args in spans:
+            event = {"name": name, "ph": "X", "pid": pid, "tid": tid,
+                     "ts": started / 1000, "dur": duration / 1000}
+            if args:
+                event["args"] = args
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, directory: str) -> str:
+        """Write the recorded spans to a new trace file in directory and return its path."""
+        os.makedirs(directory, exist_ok=True)
+        name = f"trace-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}-{next(self._sequence)}.json"
+        path = os.path.join(directory, name)
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f, default=str)
+        return path
+
+
+TRACER = SpanTracer()
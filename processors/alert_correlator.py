@@ -0,0 +1,136 @@
+import re
+import time
+import hashlib
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Numbers in subjects (hosts, percentages, counters) vary between repeats of one problem
+NUMBER_PATTERN = re.compile(r"\d+")
+
+
+class AlertGroup:
+    """Alerts sharing a fingerprint that are announced by one Telegram message."""
+
+    def __init__(self, fingerprint: str, anchor_id: str, thread_id: str, now: float):
+        self.fingerprint = fingerprint
+        self.anchor_id = anchor_id
+        self.anchor_thread_id = thread_id
+        self.open_ids: Set[str] = {anchor_id}
+        self.thread_ids: Set[str] = {thread_id}
+        self.count = 1
+        self.last_seen = now
+        self.last_edited = 0.0
+        self.dirty = False
+
+    def occurrence_note(self) -> str:
+        last_seen = time.strftime("%H:%M:%S", time.gmtime(self.last_seen))
+        return f"🔁 Occurred {self.count} times, last at {last_seen} UTC"
+
+
+class AlertCorrelator:
+    """Folds repeats of the same alert into one group per sliding window.
+
+    Alerts fingerprint on customer, environment and subject with numbers
+    masked. A new alert whose fingerprint was seen within window seconds is
+    counted on the existing group instead of being announced again; the
+    group's message is then edited at most once per edit_interval. A group
+    resolves once every alert in it has resolved.
+    """
+
+    def __init__(self, window: float = 900, edit_interval: float = 60):
+        self.window = window
+        self.edit_interval = edit_interval
+        self.groups: Dict[str, AlertGroup] = {}
+        self.groups_by_alert: Dict[str, AlertGroup] = {}
+        self.stats = {'groups': 0, 'folded': 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(alert: Dict[str, Any]) -> str:
+        subject = NUMBER_PATTERN.sub("#", str(alert.get('subject', '')).strip().lower())
+        key = f"{alert.get('customer', '')}\x1f{alert.get('environment', '')}\x1f{subject}".lower()
+        return hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+
+    def correlate(self, alerts: Iterable[Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Return the alerts that start a new group; repeats are counted on their group."""
+        now = time.time() if now is None else now
+        leaders = []
+
+        with self._lock:
+            for alert in alerts:
+                fingerprint = self.fingerprint(alert)
+                group = self.groups.get(fingerprint)
+
+                if group is None or now - group.last_seen > self.window:
+                    group = AlertGroup(fingerprint, alert['id'], alert['threadID'], now)
+                    self.groups[fingerprint] = group
+                    self.stats['groups'] += 1
+                    leaders.append(alert)
+                else:
+                    group.open_ids.add(alert['id'])
+                    group.thread_ids.add(alert['threadID'])
+                    group.count += 1
+                    group.last_seen = now
+                    group.dirty = True
+                    self.stats['folded'] += 1
+                self.groups_by_alert[alert['id']] = group
+
+        return leaders
+
+    def resolve(self, alert_ids: Iterable[str]) -> List[str]:
+        """Record resolved alerts and return the message owners that are now fully resolved.
+
+        Alerts that belong to no group (e.g. restored after a restart) are returned as is.
+        """
+        resolved = []
+        with self._lock:
+            for alert_id in alert_ids:
+                group = self.groups_by_alert.pop(alert_id, None)
+                if group is None:
+                    resolved.append(alert_id)
+                    continue
+
+                group.open_ids.discard(alert_id)
+                if not group.open_ids:
+                    self._drop(group)
+                    resolved.append(group.anchor_id)
+        return resolved
+
+    def forget(self, alert_id: str) -> None:
+        """Drop the group an alert belongs to, e.g. once it has been handled from Telegram."""
+        with self._lock:
+            group = self.groups_by_alert.get(alert_id)
+            if group is not None:
+                self._drop(group)
+                for member_id in group.open_ids:
+                    self.groups_by_alert.pop(member_id, None)
+
+    def alert_ids(self, alert_id: str) -> Set[str]:
+        """Every open alert in the alert's group."""
+        with self._lock:
+            group = self.groups_by_alert.get(alert_id)
+            return set(group.open_ids) if group else set()
+
+    def thread_ids(self, alert_id: str) -> Set[str]:
+        """Aurora threads of every open alert in the alert's group."""
+        with self._lock:
+            group = self.groups_by_alert.get(alert_id)
+            return set(group.thread_ids) if group else set()
+
+    def due_edits(self, now: Optional[float] = None) -> List[AlertGroup]:
+        """Groups with new occurrences whose message has not been edited for edit_interval."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return [
+                group for group in self.groups.values()
+                if group.dirty and now - group.last_edited >= self.edit_interval
+            ]
+
+    def mark_edited(self, group: AlertGroup, now: Optional[float] = None) -> None:
+        with self._lock:
+            group.dirty = False
+            group.last_edited = time.time() if now is None else now
+
+    def _drop(self, group: AlertGroup) -> None:
+        if self.groups.get(group.fingerprint) is group:
+            del self.groups[group.fingerprint]
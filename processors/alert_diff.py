@@ -0,0 +1,73 @@
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from clients.alert_parser import Alert, AlertBatch
+
+
+class AlertDiff:
+    """Tracks open alert IDs across polls and reports which appeared and which resolved.
+
+    An ID only counts as resolved once it has been missing from every poll
+    for grace_period seconds, so a transient empty response does not cause
+    every open alert to be announced again.
+    """
+
+    def __init__(self, grace_period: float = 300):
+        self.grace_period = grace_period
+        self.last_seen: Dict[str, float] = {}
+        self.current_ids: Set[str] = set()
+
+    def apply(self, alerts: Iterable[Dict[str, Any]],
+              now: Optional[float] = None) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Diff a fresh alert list against the known state, returning (added, resolved)."""
+        now = time.time() if now is None else now
+        added = []
+        current_ids = set()
+
+        for item in alerts:
+            alert_id = item['id']
+            if alert_id not in self.last_seen and alert_id not in current_ids:
+                added.append(item)
+            current_ids.add(alert_id)
+            self.last_seen[alert_id] = now
+
+        self.current_ids = current_ids
+        return added, self._expire(now)
+
+    def apply_batch(self, batch: AlertBatch, now: Optional[float] = None) -> Tuple[List[Alert], List[str]]:
+        """Like apply, for a parsed batch whose records cover only the IDs this diff did not know."""
+        now = time.time() if now is None else now
+        added = [alert for alert in batch.alerts if alert.id not in self.last_seen]
+
+        for alert_id in batch.ids:
+            self.last_seen[alert_id] = now
+
+        self.current_ids = set(batch.ids)
+        return added, self._expire(now)
+
+    def refresh(self, now: Optional[float] = None) -> List[str]:
+        """Mark the previous payload as seen again, returning the IDs that resolved."""
+        now = time.time() if now is None else now
+        for alert_id in self.current_ids:
+            self.last_seen[alert_id] = now
+        return self._expire(now)
+
+    def restore(self, alert_ids: Iterable[str], now: Optional[float] = None) -> None:
+        """Seed the state with persisted IDs; their grace period starts now."""
+        now = time.time() if now is None else now
+        for alert_id in alert_ids:
+            self.last_seen[alert_id] = now
+
+    def _expire(self, now: float) -> List[str]:
+        resolved = [
+            alert_id for alert_id, seen in self.last_seen.items()
+            if now - seen > self.grace_period
+        ]
+        for alert_id in resolved:
+            del self.last_seen[alert_id]
+        return resolved
+
+    def __contains__(self, alert_id: str) -> bool:
+        return alert_id in self.last_seen
+
+    def __len__(self) -> int:
+        return len(self.last_seen)
@@ -1,119 +1,435 @@
 import html
+import json
 import time
 import logging
-from typing import List, Dict, Any, Set
+import threading
+from concurrent.futures import Executor
+from typing import List, Dict, Any, Optional, Set, Tuple
+from clients.alert_parser import Alert, AlertBatch
 from clients.aurora_client import AuroraClient
+from core.shard_coordinator import ShardCoordinator
+from handlers.telegram_dispatcher import TelegramDispatcher
 from handlers.telegram_handler import TelegramHandler
+from processors.alert_correlator import AlertCorrelator
+from processors.alert_diff import AlertDiff
+from processors.alert_router import AlertRouter
+from processors.description_fetcher import DescriptionFetcher
+from processors.handled_registry import HandledRegistry
+from storage.base_store import StateStore
+from storage.memory_store import MemoryStateStore
+from utils.deadline import Deadline
+
+
+CALLBACK_STATUSES = {'dismiss': 'dismissed', 'escalate': 'escalated'}
+
+# Handled records are read back with this much overlap, to allow for flush delays and clock skew between hosts
+HANDLED_SYNC_OVERLAP = 300
 
 
 class AlertProcessor:
     """Processes alerts and manages alert state."""
 
-    def __init__(self, aurora_client: AuroraClient, telegram_handler: TelegramHandler):
+    def __init__(self, aurora_client: AuroraClient, telegram_handler: TelegramHandler,
+                 resolve_grace_period: float = 300, state_store: Optional[StateStore] = None,
+                 description_executor: Optional[Executor] = None, router: Optional[AlertRouter] = None,
+                 shard_coordinator: Optional[ShardCoordinator] = None,
+                 handled_memory_bytes: int = 8 * 1024 * 1024):
         self.aurora_client = aurora_client
         self.telegram_handler = telegram_handler
-        self.alert_ids: Set[str] = set()
-        self.handled_alerts: Dict[str, str] = {}
+        self.state_store = state_store or MemoryStateStore()
+        self.alert_diff = AlertDiff(grace_period=resolve_grace_period)
+        self.resolved_alerts: List[str] = []
+        self.sent_messages: Dict[str, Tuple[int, str]] = {}
+        self.message_users: Dict[int, int] = {}  # Alerts tracked under each message; above one for digests
+        self.handled_alerts = HandledRegistry(max_memory_bytes=handled_memory_bytes)
+        self.router = router or AlertRouter()
+        self.correlator = AlertCorrelator()
+        self.shard_coordinator = shard_coordinator
+        self.alert_threads: Dict[str, str] = {}
+        self.foreign_alerts: Set[str] = set()
+        self.dispatcher: Optional[TelegramDispatcher] = None
+        self._shard_version = -1
+        self._handled_synced_at = time.time()
+        self._sync_lock = threading.Lock()
+        # Serialises changes to sent_messages, message_users, the correlator and the handled registry,
+        # which the poll thread, the dispatcher thread and the callback pool all make
+        self._state_lock = threading.RLock()
+        self.description_fetcher = DescriptionFetcher(aurora_client, executor=description_executor)
         self.logger = logging.getLogger(self.__class__.__name__)
+        self._restore_state()
+
+    def _restore_state(self) -> None:
+        """Reload announced alerts, handled alerts and sent messages from the state store."""
+        state = self.state_store.load()
+        self.alert_diff.restore(state['seen'])
+        self.handled_alerts.update(state['handled'])
+        for alert_id, (message_id, text) in state['messages'].items():
+            self._track(alert_id, message_id, text)
+
+    @property
+    def alert_ids(self) -> Set[str]:
+        """IDs of alerts currently considered open."""
+        return set(self.alert_diff.last_seen)
 
-    def check_new_alerts(self) -> List[Dict[str, Any]]:
-        """Check for new alerts and return only new ones."""
-        alerts = self.aurora_client.get_alerts()
+    def check_new_alerts(self, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """Check for new alerts and return only new ones.
 
-        if not alerts:
-            self.alert_ids.clear()
+        IDs that resolved during this check are left in resolved_alerts.
+        """
+        self.sync_handled()
+        # Sharded workers need the thread of every open alert, so only skip alerts whose thread is known
+        known_ids = self.alert_threads if self.shard_coordinator else self.alert_diff
+        modified, batch = self.aurora_client.get_alerts_if_modified(known_ids=known_ids, deadline=deadline)
+
+        if not modified:
+            self.resolved_alerts = self.alert_diff.refresh()
+            self._forget_resolved()
+            self._rebalance_shards()
+            return []
+
+        if batch is None:
+            # Failed poll: absence is unknown, so nothing may expire
+            self.resolved_alerts = []
             return []
 
-        new_alerts = []
-        if len(alerts) > 0:
-            for item in alerts:
-                if item['id'] not in self.alert_ids:
-                    self.alert_ids.add(item['id'])
-                    new_alerts.append(item)
+        new_alerts, self.resolved_alerts = self.alert_diff.apply_batch(batch)
+        if self.resolved_alerts:
+            self.logger.info(f"{len(self.resolved_alerts)} alerts resolved")
+
+        if self.shard_coordinator:
+            new_alerts = self._claim_owned(batch, new_alerts)
+
+        self.state_store.mark_seen(alert['id'] for alert in new_alerts)
+        self._forget_resolved()
+        self._rebalance_shards()
+        return new_alerts
+
+    def _forget_resolved(self) -> None:
+        self.state_store.forget_seen(self.resolved_alerts)
+        for alert_id in self.resolved_alerts:
+            self.alert_threads.pop(alert_id, None)
+            self.foreign_alerts.discard(alert_id)
+
+    def sync_handled(self, min_interval: float = 1) -> None:
+        """Take over alerts that another worker of the shard group handled from Telegram.
+
+        Only the leader receives button presses, so the worker that owns the
+        alert learns of them from the shared state store. The alert's message
+        and group are dropped so they are no longer edited or paged.
+        """
+        if not self.shard_coordinator:
+            return
+        now = time.time()
+        with self._sync_lock:
+            if now - self._handled_synced_at < min_interval:
+                return
+            since, self._handled_synced_at = self._handled_synced_at, now
+
+        for alert_id, status in self.state_store.handled_since(since - HANDLED_SYNC_OVERLAP).items():
+            with self._state_lock:
+                if self.handled_alerts.is_alert_handled(alert_id):
+                    continue
+                self.handled_alerts.mark_alert(alert_id, status)
+                self.correlator.forget(alert_id)
+                self._untrack(alert_id)
+
+    def is_alert_handled(self, alert_id: str) -> bool:
+        """Whether an alert was dismissed or escalated, by this worker or another one in its shard group."""
+        if not self.handled_alerts.is_alert_handled(alert_id):
+            self.sync_handled()
+        return self.handled_alerts.is_alert_handled(alert_id)
+
+    def _claim_owned(self, batch: AlertBatch, new_alerts: List[Alert]) -> List[Alert]:
+        """Keep the new alerts whose shard this worker owns; the rest are left to their owners."""
+        for alert in batch.alerts:
+            self.alert_threads[alert.id] = alert.threadID
+
+        owned = []
+        for alert in new_alerts:
+            if self.shard_coordinator.owns(alert.threadID):
+                owned.append(alert)
+            else:
+                self.foreign_alerts.add(alert.id)
+        return owned
 
-            if new_alerts:
-                return new_alerts.copy()
+    def _rebalance_shards(self) -> None:
+        """Hand over or take over open alerts after shard ownership changed or lapsed.
+
+        Alerts in shards this worker lost are forgotten here. Alerts in shards
+        it gained, or that arrived while its leases had lapsed, keep their
+        message if another worker announced them; otherwise they are
+        announced again on the next poll.
+        """
+        if not self.shard_coordinator or self.shard_coordinator.version == self._shard_version:
+            return
+        self._shard_version = self.shard_coordinator.version
+
+        adopted = []
+        for alert_id, thread_id in self.alert_threads.items():
+            if self.shard_coordinator.owns(thread_id):
+                if alert_id in self.foreign_alerts:
+                    adopted.append(alert_id)
+            elif alert_id not in self.foreign_alerts:
+                self.foreign_alerts.add(alert_id)
+                with self._state_lock:
+                    self._untrack(alert_id)
+
+        if not adopted:
+            return
+
+        state = self.state_store.load()
+        unannounced = 0
+        for alert_id in adopted:
+            self.foreign_alerts.discard(alert_id)
+            if alert_id in state['seen']:
+                if alert_id in state['messages']:
+                    with self._state_lock:
+                        self._track(alert_id, *state['messages'][alert_id])
+            else:
+                self.alert_diff.last_seen.pop(alert_id, None)
+                self.alert_threads.pop(alert_id, None)
+                unannounced += 1
+
+        if unannounced:
+            self.aurora_client.reset_alerts_cache()
+        self.logger.info(f"Took over {len(adopted)} open alerts, {unannounced} not yet announced")
+
+    def use_dispatcher(self, dispatcher: TelegramDispatcher) -> None:
+        """Send message edits through dispatcher, so they share its rate limits."""
+        self.dispatcher = dispatcher
+
+    def _edit_message(self, message_id: int, text: str, reply_markup: Optional[str] = None) -> None:
+        if self.dispatcher:
+            self.dispatcher.submit_edit(message_id, text, reply_markup)
         else:
-            self.alert_ids.clear()
+            self.telegram_handler.edit_message(message_id, text, reply_markup=reply_markup)
 
-        return []
+    def track_messages(self, messages: List[Dict[str, Any]], sent: Dict[str, int]) -> None:
+        """Remember the Telegram messages sent for alerts so they can be updated later."""
+        for message_info in messages:
+            message_id = sent.get(message_info["alert_id"])
+            if message_id is not None:
+                with self._state_lock:
+                    self._track(message_info["alert_id"], message_id, message_info["message"])
+                self.state_store.track_message(message_info["alert_id"], message_id, message_info["message"])
 
-    def format_alert_messages(self, alerts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Format alerts into Telegram messages."""
-        messages = []
+    def _track(self, alert_id: str, message_id: int, text: str) -> None:
+        """Record alert_id's message; the caller holds _state_lock (or is still constructing)."""
+        self._untrack(alert_id)
+        self.sent_messages[alert_id] = (message_id, text)
+        self.message_users[message_id] = self.message_users.get(message_id, 0) + 1
+
+    def _untrack(self, alert_id: str) -> Optional[Tuple[int, str]]:
+        """Drop and return alert_id's message record; the caller holds _state_lock."""
+        sent = self.sent_messages.pop(alert_id, None)
+        if sent is not None:
+            users = self.message_users.pop(sent[0], 0) - 1
+            if users > 0:
+                self.message_users[sent[0]] = users
+        return sent
+
+    def forget_undelivered(self, messages: List[Dict[str, Any]]) -> None:
+        """Un-mark alerts whose message was never delivered, so they are announced after a restart."""
+        self.state_store.forget_seen(message_info["alert_id"] for message_info in messages)
+
+    def correlate_alerts(self, alerts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fold repeats of recently announced alerts into their group; return the ones to announce."""
+        with self._state_lock:
+            leaders = self.correlator.correlate(alerts)
+        if len(leaders) < len(alerts):
+            self.logger.info(f"{len(alerts) - len(leaders)} repeated alerts folded into existing messages")
+        return leaders
+
+    def update_correlated_messages(self) -> None:
+        """Edit group messages to show how often their alert has repeated."""
+        edits = []
+        with self._state_lock:
+            for group in self.correlator.due_edits():
+                sent = self.sent_messages.get(group.anchor_id)
+                if sent is None:
+                    # Still queued for delivery; edited on a later cycle
+                    continue
+                self.correlator.mark_edited(group)
+                # A digest line has no room for a count; its buttons already cover the group
+                if not self._shares_message(group.anchor_id, sent[0]):
+                    edits.append((group, sent))
+
+        for group, (message_id, message_text) in edits:
+            # Editing the text drops the buttons unless they are sent again
+            buttons = self.telegram_handler.alert_keyboard(group.anchor_thread_id, group.anchor_id)
+            self._edit_message(message_id, f"{message_text.rstrip()}\n{group.occurrence_note()}", buttons)
+
+    def update_resolved_messages(self) -> None:
+        """Mark the Telegram messages of resolved alerts as resolved and drop their buttons.
+
+        A message shared by a group of repeated alerts, or a digest of several
+        alerts, resolves with the last of them.
+        """
+        resolved = []
+        with self._state_lock:
+            for alert_id in self.correlator.resolve(self.resolved_alerts):
+                sent = self._untrack(alert_id)
+                if sent is not None:
+                    resolved.append((alert_id, sent, self._shares_message(alert_id, sent[0])))
 
+        for alert_id, (message_id, message_text), shared in resolved:
+            self.state_store.forget_message(alert_id)
+            if not shared:
+                self._edit_message(message_id, f"✅ <b>Resolved</b>\n{message_text}")
+
+    def format_alert_messages(self, alerts: List[Dict[str, Any]],
+                              deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """Route alerts and format the ones that are not suppressed into Telegram messages."""
+        routed = []
         for alert in alerts:
-            alert_description = self.aurora_client.get_alert_description(alert["threadID"])
+            route = self.router.route(alert)
+            if route is not None:
+                routed.append((alert, route))
+
+        if len(routed) < len(alerts):
+            self.logger.info(f"{len(alerts) - len(routed)} alerts suppressed by routing rules")
+
+        messages = []
+        descriptions = self.description_fetcher.fetch_many((alert["threadID"] for alert, _ in routed), deadline)
+
+        for alert, route in routed:
+            alert_description = descriptions.get(alert["threadID"])
             if alert_description:
                 alert_description = alert_description[:100]
             else:
                 alert_description = "No description available"
 
-            if alert.get('severity') == 'critical':
-                message_text = (
-                    f"<b>Critical</b> 🔴 {alert['customer']}:{alert['environment']} - "
-                    f"{alert['subject']}\n{html.escape(alert_description)}\n"
-                )
-            else:
-                message_text = (
-                    f"<b>Trivial</b> 🟡 {alert['customer']} : {alert['environment']} \n"
-                    f"{alert['subject']}\n{html.escape(alert_description)}\n"
-                )
-
-            messages.append({
-                "message": message_text,
-                "thread_id": alert["threadID"],
-                "alert_id": alert["id"]
-            })
+            messages.append(route.format(alert, alert_description))
 
         return messages
 
     def handle_callback_query(self, update: Dict[str, Any]) -> None:
         """Handle callback queries from Telegram."""
+        parsed = self.parse_callback(update)
+        if parsed is None:
+            return
+
+        action, thread_id, alert_id = parsed
+        if self.handled_alerts.is_alert_handled(alert_id):
+            self.logger.info(f"Alert {alert_id} has already been handled.")
+            return
+
+        succeeded = self.perform_action(action, thread_id, alert_id)
+        self.complete_callback(update, action, alert_id, succeeded)
+
+    def parse_callback(self, update: Dict[str, Any]) -> Optional[Tuple[str, str, str]]:
+        """Split callback data into (action, thread_id, alert_id), or None if it is invalid.
+
+        A trailing tenant tag, added by multi-tenant handlers, is ignored here.
+        """
         callback_data = update.get('callback_query', {}).get('data', '')
+
+        parts = self.split_callback_data(callback_data)
+        if parts is None:
+            self.logger.error(f"Invalid callback data format: {callback_data}")
+            return None
+        action, thread_id, alert_id = parts
+
+        if action not in CALLBACK_STATUSES:
+            self.logger.warning(f"Unknown action: {action}")
+            return None
+        return action, thread_id, alert_id
+
+    @staticmethod
+    def split_callback_data(callback_data: str) -> Optional[Tuple[str, str, str]]:
+        """(action, thread_id, alert_id) of action:thread_id:alert_id[:callback_tag], or None."""
+        parts = callback_data.split(":")
+        if len(parts) not in (3, 4):
+            return None
+        return parts[0], parts[1], parts[2]
+
+    def perform_action(self, action: str, thread_id: str, alert_id: str) -> bool:
+        """Apply a dismiss or escalate action in Aurora."""
+        if action == 'dismiss':
+            succeeded = self.aurora_client.dismiss_alert(thread_id)
+            # The message also stands for the repeats folded into it
+            for other_thread_id in self.correlator.thread_ids(alert_id) - {thread_id}:
+                self.aurora_client.dismiss_alert(other_thread_id)
+            return succeeded
+        succeeded = self.aurora_client.escalate_alert(alert_id)
+        # The group is forgotten once handled, so its repeats are escalated along with it
+        for other_alert_id in self.correlator.alert_ids(alert_id) - {alert_id}:
+            self.aurora_client.escalate_alert(other_alert_id)
+        return succeeded
+
+    def complete_callback(self, update: Dict[str, Any], action: str, alert_id: str, succeeded: bool) -> None:
+        """Record the outcome of an action and update its Telegram message."""
         message_id = update.get('callback_query', {}).get('message', {}).get('message_id')
         user_id = update.get('callback_query', {}).get('from', {}).get('id')
         message_text = update.get('callback_query', {}).get('message', {}).get('text', '')
+        status = CALLBACK_STATUSES[action]
 
-        try:
-            action, thread_id, alert_id = callback_data.split(":")
-        except ValueError:
-            self.logger.error(f"Invalid callback data format: {callback_data}")
+        if not succeeded:
+            self.logger.error(f"Failed to {action} alert {alert_id} in system")
             return
 
-        if alert_id in self.handled_alerts:
-            self.logger.info(f"Alert {alert_id} has already been handled.")
-            return
+        with self._state_lock:
+            if self.handled_alerts.is_alert_handled(alert_id):
+                # Completed meanwhile by another press or, in a shard group, by the owner's sync
+                return
+            self.handled_alerts.mark_alert(alert_id, status)
+            self.correlator.forget(alert_id)
+            sent = self._untrack(alert_id)
+            shared = sent is not None and self._shares_message(alert_id, sent[0])
+        self.logger.info(f"User {user_id} {status} alert {alert_id}")
+        self.state_store.mark_handled(alert_id, status)
+        self.state_store.forget_message(alert_id)
 
-        if action == 'dismiss':
-            self.logger.info(f"User {user_id} dismissed alert {alert_id}")
-            if self.aurora_client.dismiss_alert(thread_id):
-                self.handled_alerts[alert_id] = 'dismissed'
-                response_text = "The alert has been dismissed."
-                self._acknowledge_callback(message_id, response_text, message_text)
-            else:
-                self.logger.error(f"Failed to dismiss alert {alert_id} in system")
-
-        elif action == 'escalate':
-            self.logger.info(f"User {user_id} escalated alert {alert_id}")
-            if self.aurora_client.escalate_alert(alert_id):
-                self.handled_alerts[alert_id] = 'escalated'
-                response_text = "The alert has been escalated."
-                self._acknowledge_callback(message_id, response_text, message_text)
-            else:
-                self.logger.error(f"Failed to escalate alert {alert_id} in system")
+        # In a shard group the leader has no record of other workers' digests, so the
+        # pressed message's own keyboard tells whether other alerts share it
+        other_rows = self._other_alert_rows(update, alert_id)
+        if shared or other_rows:
+            digest_text = sent[1] if sent is not None else html.escape(message_text)
+            self._acknowledge_digest_line(update, other_rows, digest_text)
         else:
-            self.logger.warning(f"Unknown action: {action}")
+            self._acknowledge_callback(message_id, f"The alert has been {status}.", message_text)
+
+    def _shares_message(self, alert_id: str, message_id: int) -> bool:
+        """Whether another open alert is tracked under the same Telegram message, i.e. a digest.
+
+        The caller holds _state_lock.
+        """
+        users = self.message_users.get(message_id, 0)
+        sent = self.sent_messages.get(alert_id)
+        if sent is not None and sent[0] == message_id:
+            users -= 1
+        return users > 0
+
+    def _other_alert_rows(self, update: Dict[str, Any], alert_id: str) -> List[List[Dict[str, Any]]]:
+        """Keyboard rows of the pressed message that belong to alerts other than alert_id."""
+        message = update.get('callback_query', {}).get('message', {})
+        rows = message.get('reply_markup', {}).get('inline_keyboard', [])
+        return [row for row in rows if not any(self._button_alert_id(button) == alert_id for button in row)]
+
+    def _acknowledge_digest_line(self, update: Dict[str, Any], remaining: List[List[Dict[str, Any]]],
+                                 digest_text: str) -> None:
+        """Drop the buttons of one handled alert from a digest, keeping the other alerts' rows."""
+        message_id = update.get('callback_query', {}).get('message', {}).get('message_id')
+        self.telegram_handler.edit_message(message_id, digest_text,
+                                           reply_markup=json.dumps({"inline_keyboard": remaining}))
+
+    def _button_alert_id(self, button: Dict[str, Any]) -> Optional[str]:
+        parts = self.split_callback_data(button.get('callback_data', ''))
+        return parts[2] if parts else None
 
     def _acknowledge_callback(self, message_id: int, response_text: str, alert_snippet: str) -> None:
         """Acknowledge callback by updating the message."""
-        if message_id not in self.handled_alerts:
+        with self._state_lock:
+            already_handled = self.handled_alerts.is_message_handled(message_id)
+            if not already_handled:
+                self.handled_alerts.mark_message(message_id)
+
+        if not already_handled:
             current_timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
             alert_snippet = alert_snippet[:100] + "..." if len(alert_snippet) > 100 else alert_snippet
 
             updated_text = f"{response_text} [Updated at {current_timestamp}] - Alert: {alert_snippet}"
 
-            self.handled_alerts[message_id] = True
             self.telegram_handler.edit_message(message_id, updated_text, remove_buttons=True)
         else:
             self.logger.info(f"Alert for message_id {message_id} has already been dismissed")
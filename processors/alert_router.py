@@ -0,0 +1,252 @@
+import re
+import html
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from config.routing_config import MATCH_FIELDS, MessageTemplate, RoutingRule
+from handlers.telegram_dispatcher import PRIORITY_CRITICAL, PRIORITY_TRIVIAL
+from utils.ttl_cache import TTLCache
+
+CRITICAL_TEMPLATE = "<b>Critical</b> 🔴 {customer}:{environment} - {subject}\n{description}\n"
+TRIVIAL_TEMPLATE = "<b>Trivial</b> 🟡 {customer} : {environment} \n{subject}\n{description}\n"
+
+
+class Route:
+    """The outcome of routing one alert."""
+
+    def __init__(self, rule_name: Optional[str], severity: str, page: bool, template: MessageTemplate):
+        self.rule_name = rule_name
+        self.severity = severity
+        self.critical = severity == 'critical'
+        self.priority = PRIORITY_CRITICAL if self.critical else PRIORITY_TRIVIAL
+        self.page = page
+        self.template = template
+
+    def format(self, alert: Dict[str, Any], description: str) -> Dict[str, Any]:
+        """Build the Telegram message for an alert sent along this route."""
+        values = {
+            'customer': str(alert.get('customer', '')),
+            'environment': str(alert.get('environment', '')),
+            'subject': str(alert.get('subject', '')),
+            'severity': self.severity,
+            'description': html.escape(description),
+            'id': str(alert['id']),
+            'threadID': str(alert['threadID']),
+        }
+        emoji = "🔴" if self.critical else "🟡"
+        return {
+            "message": self.template.render(values),
+            "summary": f"{emoji} {values['customer']}:{values['environment']} - {values['subject']}",
+            "priority": self.priority,
+            "page": self.page,
+            "thread_id": alert["threadID"],
+            "alert_id": alert["id"],
+        }
+
+
+def _required_literals(pattern: str) -> List[str]:
+    """Literal runs that every match of the regex pattern must contain.
+
+    A deliberately simple scan: groups, classes, escapes and optional
+    characters end a run, and a top-level alternation or an inline flag
+    means nothing is required. Missing a literal only costs index precision.
+    """
+    runs: List[str] = []
+    run: List[str] = []
+    position = 0
+    while position < len(pattern):
+        char = pattern[position]
+        position += 1
+        literal = None
+        if char == '\\':
+            escaped = pattern[position:position + 1]
+            position += 1
+            if escaped and not escaped.isalnum():
+                literal = escaped
+            elif escaped not in 'dDwWsSbBAZ':
+                # Code points and backreferences are not worth parsing
+                return []
+        elif char == '|':
+            return []
+        elif char in '([':
+            if pattern.startswith('?', position) and pattern[position + 1:position + 2] in tuple('aiLmsux'):
+                return []
+            position = _skip_group(pattern, position, char)
+        elif char == '{':
+            closing = pattern.find('}', position)
+            position = len(pattern) if closing < 0 else closing + 1
+        elif char not in '.^$*+?}])':
+            literal = char
+
+        if literal is None:
+            runs.append(''.join(run))
+            run = []
+            continue
+        follower = pattern[position:position + 1]
+        if follower and follower in '*?{':
+            # An optional character is not required, and ends the run
+            runs.append(''.join(run))
+            run = []
+        elif follower == '+':
+            run.append(literal)
+            runs.append(''.join(run))
+            run = []
+        else:
+            run.append(literal)
+    runs.append(''.join(run))
+    return [run.lower() for run in runs if len(run) >= 3 and run.isascii()]
+
+
+def _skip_group(pattern: str, position: int, opener: str) -> int:
+    """Position just past the group or character class opened before position."""
+    depth = 1
+    in_class = opener == '['
+    class_start = position
+    while position < len(pattern) and depth:
+        char = pattern[position]
+        position += 1
+        if char == '\\':
+            position += 1
+        elif char == '^' and in_class and position - 1 == class_start:
+            class_start = position
+        elif in_class and position - 1 == class_start:
+            # A ] right after the opening [ or [^ is a member, not the end
+            pass
+        elif in_class:
+            if char == ']':
+                in_class = False
+                depth -= opener == '['
+        elif char == '[':
+            in_class = True
+            class_start = position
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+    return position
+
+
+class AlertRouter:
+    """Routes alerts through routing rules compiled into per-field indexes.
+
+    Each of customer, environment and severity maps a value to a bitmask of
+    the rules that require it, and a wildcard mask holds the rules that do
+    not constrain the field. ANDing three masks narrows thousands of rules
+    to the few whose fields match; that mask depends only on the three
+    fields and is cached.
+
+    Subject patterns are indexed by two trigrams of the literals each
+    pattern requires, so the trigrams of an alert's subject select the few
+    patterns worth running. Patterns without a literal of three characters are run
+    whenever their fields match. Windows and expiry are checked per call.
+    """
+
+    def __init__(self, rules: Iterable[RoutingRule] = (), cache_size: int = 4096):
+        self.rules: List[RoutingRule] = list(rules)
+        self.routes: List[Optional[Dict[str, Route]]] = []
+        self.subjects: List[Optional[re.Pattern]] = []
+        self.indexes: Dict[str, Dict[str, int]] = {field: {} for field in MATCH_FIELDS}
+        self.wildcards: Dict[str, int] = {field: 0 for field in MATCH_FIELDS}
+        self.trigrams: Tuple[Dict[str, int], Dict[str, int]] = ({}, {})
+        self.trigram_indexed = 0
+        self.field_cache = TTLCache(max_size=cache_size, ttl=3600)
+        self.default_routes = {
+            'critical': Route(None, 'critical', True, MessageTemplate(CRITICAL_TEMPLATE)),
+            'trivial': Route(None, 'trivial', True, MessageTemplate(TRIVIAL_TEMPLATE)),
+        }
+
+        trigram_rules: Dict[str, int] = {}
+        for position, rule in enumerate(self.rules):
+            bit = 1 << position
+            for field in MATCH_FIELDS:
+                values = getattr(rule, field)
+                if not values:
+                    self.wildcards[field] |= bit
+                for value in values:
+                    self.indexes[field][value] = self.indexes[field].get(value, 0) | bit
+            self.subjects.append(re.compile(rule.subject, re.IGNORECASE) if rule.subject else None)
+            self.routes.append(None if rule.suppress else self._compile_route(rule))
+
+            if rule.subject:
+                grams = {run[i:i + 3] for run in _required_literals(rule.subject) for i in range(len(run) - 2)}
+                if grams:
+                    # Spread the patterns over their least shared trigrams
+                    chosen = sorted(grams, key=lambda gram: (trigram_rules.get(gram, 0), gram))[:2]
+                    for table, gram in zip(self.trigrams, (chosen[0], chosen[-1])):
+                        table[gram] = table.get(gram, 0) | bit
+                        trigram_rules[gram] = trigram_rules.get(gram, 0) + 1
+                    self.trigram_indexed |= bit
+
+    def _compile_route(self, rule: RoutingRule) -> Dict[str, Route]:
+        """Precompile the rule's route for critical and non-critical alerts."""
+        page = True if rule.page is None else rule.page
+        routes = {}
+        template = MessageTemplate(rule.template) if rule.template else None
+        for alert_severity in ('critical', 'trivial'):
+            default = self._default_route(rule.set_severity or alert_severity)
+            routes[alert_severity] = Route(rule.name, default.severity, page, template or default.template)
+        return routes
+
+    def route(self, alert: Dict[str, Any], now: Optional[float] = None) -> Optional[Route]:
+        """Return the route for an alert, or None if a rule suppresses it."""
+        severity = 'critical' if str(alert.get('severity') or '').lower() == 'critical' else 'trivial'
+        position = self._first_match(alert, time.time() if now is None else now)
+        if position is None:
+            return self.default_routes[severity]
+
+        routes = self.routes[position]
+        if routes is None:
+            return None
+        return routes[severity]
+
+    def _field_mask(self, alert: Dict[str, Any]) -> int:
+        """Bitmask of the rules whose customer, environment and severity match the alert."""
+        key = (str(alert.get('customer', '')).lower(), str(alert.get('environment', '')).lower(),
+               str(alert.get('severity') or '').lower())
+        mask = self.field_cache.get(key)
+        if mask is not None:
+            return mask
+
+        mask = -1
+        for field, value in zip(MATCH_FIELDS, key):
+            mask &= self.indexes[field].get(value, 0) | self.wildcards[field]
+            if not mask:
+                break
+
+        self.field_cache.set(key, mask)
+        return mask
+
+    def _subject_mask(self, subject: str) -> int:
+        """Bitmask of the trigram-indexed rules whose both trigrams occur in subject."""
+        text = subject.lower()
+        if not text.isascii():
+            # Case-insensitive matching folds some non-ASCII characters to ASCII ones
+            return self.trigram_indexed
+
+        first = second = 0
+        firsts, seconds = self.trigrams
+        for i in range(len(text) - 2):
+            gram = text[i:i + 3]
+            first |= firsts.get(gram, 0)
+            second |= seconds.get(gram, 0)
+        return first & second
+
+    def _first_match(self, alert: Dict[str, Any], now: float) -> Optional[int]:
+        """Position of the first active rule matching the alert, in rule order."""
+        mask = self._field_mask(alert)
+        subject = str(alert.get('subject', ''))
+        if mask & self.trigram_indexed:
+            mask &= ~self.trigram_indexed | self._subject_mask(subject)
+
+        while mask:
+            lowest = mask & -mask
+            position = lowest.bit_length() - 1
+            mask ^= lowest
+            if not self.rules[position].is_active(now):
+                continue
+            pattern = self.subjects[position]
+            if pattern is None or pattern.search(subject):
+                return position
+        return None
+
+    def _default_route(self, severity: str) -> Route:
+        return self.default_routes['critical' if severity == 'critical' else 'trivial']
@@ -0,0 +1,97 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+from handlers.telegram_handler import TelegramHandler
+from processors.alert_processor import AlertProcessor
+
+
+class CallbackExecutor:
+    """Runs Telegram button actions on a bounded worker pool.
+
+    Every press is answered with answerCallbackQuery straight away, from a
+    separate small pool so answers never wait behind slow Aurora actions.
+    Presses that target the same Aurora object while an action is in
+    flight, including while its messages are being updated, are attached
+    to that action instead of starting another. Dismiss acts on a whole
+    thread, so dismissing several alerts of one thread costs one Aurora call.
+    """
+
+    def __init__(self, alert_processor: AlertProcessor, telegram_handler: TelegramHandler, max_workers: int = 8,
+                 answer_workers: int = 2):
+        self.alert_processor = alert_processor
+        self.telegram_handler = telegram_handler
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="callback")
+        self.answer_executor = ThreadPoolExecutor(max_workers=answer_workers, thread_name_prefix="callback-answer")
+        self.in_flight: Dict[Tuple[str, str], List[Tuple[Dict[str, Any], str]]] = {}
+        self.stats = {'received': 0, 'collapsed': 0, 'actions': 0}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def submit(self, update: Dict[str, Any]) -> None:
+        """Acknowledge a callback query and schedule its action; returns immediately."""
+        callback_query_id = update.get('callback_query', {}).get('id')
+        parsed = self.alert_processor.parse_callback(update)
+        with self._lock:
+            self.stats['received'] += 1
+
+        if parsed is None:
+            self._answer(callback_query_id, "Unknown action")
+            return
+
+        action, thread_id, alert_id = parsed
+        if self.alert_processor.handled_alerts.is_alert_handled(alert_id):
+            self._answer(callback_query_id, "Already handled")
+            return
+
+        key = (action, thread_id if action == 'dismiss' else alert_id)
+        with self._lock:
+            batch = self.in_flight.get(key)
+            if batch is not None:
+                batch.append((update, alert_id))
+                self.stats['collapsed'] += 1
+            else:
+                self.in_flight[key] = [(update, alert_id)]
+
+        self._answer(callback_query_id, f"{action.capitalize()} in progress...")
+        if batch is None:
+            self.executor.submit(self._run, key)
+
+    def shutdown(self) -> None:
+        """Wait for in-flight actions to finish and stop the pool."""
+        self.executor.shutdown(wait=True)
+        self.answer_executor.shutdown(wait=True)
+
+    def _answer(self, callback_query_id: str, text: str) -> None:
+        if callback_query_id:
+            self.answer_executor.submit(self.telegram_handler.answer_callback_query, callback_query_id, text)
+
+    def _run(self, key: Tuple[str, str]) -> None:
+        action, target = key
+        with self._lock:
+            first_alert_id = self.in_flight[key][0][1]
+        try:
+            if action == 'dismiss':
+                succeeded = self.alert_processor.perform_action(action, target, first_alert_id)
+            else:
+                succeeded = self.alert_processor.perform_action(action, "", target)
+        except Exception as e:
+            self.logger.error(f"Error running {action} for {target}: {e}")
+            succeeded = False
+
+        # The key stays in flight until every attached press is completed, so a
+        # press arriving before its alert is marked handled joins this action
+        while True:
+            with self._lock:
+                batch = self.in_flight[key]
+                if not batch:
+                    del self.in_flight[key]
+                    self.stats['actions'] += 1
+                    break
+                self.in_flight[key] = []
+
+            # Each press can be for a different alert and message of the same thread
+            for update, alert_id in batch:
+                if not self.alert_processor.handled_alerts.is_alert_handled(alert_id):
+                    self.alert_processor.complete_callback(update, action, alert_id, succeeded)
+        self.alert_processor.state_store.flush()
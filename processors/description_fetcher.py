@@ -0,0 +1,77 @@
+import logging
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, TimeoutError, as_completed
+from typing import Dict, Iterable, Optional
+from clients.aurora_client import AuroraClient
+from metrics.tracer import TRACER
+from utils.deadline import Deadline
+from utils.ttl_cache import TTLCache
+
+
+class DescriptionFetcher:
+    """Fetches alert descriptions concurrently and caches them per thread."""
+
+    def __init__(self, aurora_client: AuroraClient, max_workers: int = 8,
+                 cache_size: int = 1024, cache_ttl: float = 3600, executor: Optional[Executor] = None):
+        self.aurora_client = aurora_client
+        self.cache = TTLCache(max_size=cache_size, ttl=cache_ttl)
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="description")
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def fetch_many(self, thread_ids: Iterable[str], deadline: Optional[Deadline] = None) -> Dict[str, Optional[str]]:
+        """Return descriptions for the given threads, fetching each uncached thread once.
+
+        Threads still being fetched when deadline passes map to None; their
+        descriptions are cached when they arrive, for the next alert.
+        """
+        descriptions: Dict[str, Optional[str]] = {}
+        missing = []
+
+        for thread_id in dict.fromkeys(thread_ids):
+            cached = self.cache.get(thread_id)
+            if cached is not None:
+                descriptions[thread_id] = cached
+            else:
+                missing.append(thread_id)
+
+        if not missing:
+            return descriptions
+
+        futures = {
+            self.executor.submit(self.aurora_client.get_alert_description, thread_id, deadline): thread_id
+            for thread_id in missing
+        }
+
+        for future, thread_id in futures.items():
+            future.add_done_callback(lambda done, thread_id=thread_id: self._store(thread_id, done))
+
+        try:
+            with TRACER.span("fetch_descriptions", threads=len(missing)):
+                for future in as_completed(futures, timeout=deadline.remaining() if deadline else None):
+                    descriptions[futures[future]] = self._result(futures[future], future)
+        except TimeoutError:
+            for future in futures:
+                future.cancel()  # Only drops fetches that have not started yet
+            late = [thread_id for thread_id in missing if thread_id not in descriptions]
+            self.logger.warning(f"{len(late)} alert descriptions not fetched before the cycle deadline")
+            descriptions.update(dict.fromkeys(late))
+
+        self.logger.info(f"Fetched {len(missing)} alert descriptions ({len(descriptions) - len(missing)} cached)")
+        return descriptions
+
+    def _result(self, thread_id: str, future: Future) -> Optional[str]:
+        try:
+            return future.result()
+        except Exception as e:
+            self.logger.error(f"Error fetching description for thread {thread_id}: {e}")
+            return None
+
+    def _store(self, thread_id: str, future: Future) -> None:
+        # Failed fetches are not cached so the next alert in the thread retries
+        if not future.cancelled() and future.exception() is None and future.result() is not None:
+            self.cache.set(thread_id, future.result())
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, unless it is shared with other fetchers."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
@@ -0,0 +1,48 @@
+from typing import Any, Dict, Hashable, Optional
+from utils.ttl_cache import TTLCache
+
+# Rough per-entry footprint (key, value tuple, OrderedDict link) used to turn
+# a memory ceiling into an entry count.
+APPROX_ENTRY_BYTES = 256
+
+
+class HandledRegistry:
+    """Bounded record of handled alerts and acknowledged Telegram messages.
+
+    Alert IDs and message IDs live in separate LRU caches whose entries
+    also expire after ttl seconds. Lookups are O(1), and together the two
+    namespaces stay under max_memory_bytes.
+    """
+
+    def __init__(self, ttl: float = 7 * 24 * 3600, max_memory_bytes: int = 8 * 1024 * 1024):
+        max_entries = max(1, max_memory_bytes // APPROX_ENTRY_BYTES // 2)
+        self.alerts = TTLCache(max_size=max_entries, ttl=ttl)
+        self.messages = TTLCache(max_size=max_entries, ttl=ttl)
+
+    def alert_status(self, alert_id: str) -> Optional[str]:
+        """Return 'dismissed'/'escalated' for a handled alert, or None."""
+        return self.alerts.get(alert_id)
+
+    def is_alert_handled(self, alert_id: str) -> bool:
+        return self.alert_status(alert_id) is not None
+
+    def mark_alert(self, alert_id: str, status: str) -> None:
+        self.alerts.set(alert_id, status)
+
+    def is_message_handled(self, message_id: Hashable) -> bool:
+        return self.messages.get(message_id) is not None
+
+    def mark_message(self, message_id: Hashable) -> None:
+        self.messages.set(message_id, True)
+
+    def update(self, handled: Dict[str, str]) -> None:
+        """Bulk-load alert statuses, oldest first, e.g. from the state store."""
+        for alert_id, status in handled.items():
+            self.alerts.set(alert_id, status)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-namespace size, hit, miss and eviction counters."""
+        return {'alerts': self.alerts.stats(), 'messages': self.messages.stats()}
+
+    def __len__(self) -> int:
+        return len(self.alerts) + len(self.messages)
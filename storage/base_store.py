@@ -0,0 +1,120 @@
+import time
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+class StateStore(ABC):
+    """Abstract base class for persistent monitor state backends.
+
+    Mutations are buffered in memory and written in a single batch by
+    flush(), which the monitor calls once per cycle.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._reset_pending()
+
+    def mark_seen(self, alert_ids: Iterable[str]) -> None:
+        """Record alert IDs that have been announced."""
+        now = time.time()
+        with self._lock:
+            for alert_id in alert_ids:
+                self._pending_seen[alert_id] = now
+
+    def forget_seen(self, alert_ids: Iterable[str]) -> None:
+        """Drop alert IDs that have resolved."""
+        with self._lock:
+            for alert_id in alert_ids:
+                self._pending_seen[alert_id] = None
+
+    def mark_handled(self, alert_id: str, status: str) -> None:
+        """Record that an alert was dismissed or escalated."""
+        with self._lock:
+            self._pending_handled[alert_id] = (status, time.time())
+
+    def track_message(self, alert_id: str, message_id: int, text: str) -> None:
+        """Record the Telegram message sent for an alert."""
+        with self._lock:
+            self._pending_messages[alert_id] = (message_id, text)
+
+    def forget_message(self, alert_id: str) -> None:
+        """Drop the Telegram message record for an alert."""
+        with self._lock:
+            self._pending_messages[alert_id] = None
+
+    def set_value(self, key: str, value: str) -> None:
+        """Store a small named value, such as the Telegram update offset."""
+        with self._lock:
+            self._pending_values[key] = value
+
+    def get_value(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Return a named value, preferring one that has not been flushed yet."""
+        with self._lock:
+            if key in self._pending_values:
+                return self._pending_values[key]
+        return self._read_value(key, default)
+
+    def handled_since(self, since: float) -> Dict[str, str]:
+        """Statuses of alerts handled at or after since, by any process sharing the backend."""
+        handled = self._read_handled_since(since)
+        with self._lock:
+            handled.update((alert_id, status) for alert_id, (status, ts) in self._pending_handled.items()
+                           if ts >= since)
+        return handled
+
+    def flush(self) -> None:
+        """Write all buffered changes in one batch."""
+        with self._lock:
+            batch = {
+                'seen': self._pending_seen,
+                'handled': self._pending_handled,
+                'messages': self._pending_messages,
+                'values': self._pending_values,
+            }
+            if not any(batch.values()):
+                return
+
+            try:
+                self._write(batch)
+            except Exception as e:
+                # Keep the batch buffered so the next flush retries it
+                self.logger.error(f"Error writing state batch: {e}")
+                return
+            self._reset_pending()
+
+    def close(self) -> None:
+        """Flush pending changes and release the backend."""
+        self.flush()
+
+    def _reset_pending(self) -> None:
+        self._pending_seen: Dict[str, Optional[float]] = {}
+        self._pending_handled: Dict[str, Tuple[str, float]] = {}
+        self._pending_messages: Dict[str, Optional[Tuple[int, str]]] = {}
+        self._pending_values: Dict[str, str] = {}
+
+    @abstractmethod
+    def load(self) -> Dict[str, Any]:
+        """Return persisted state as a dict with 'seen', 'handled' and 'messages' keys.
+
+        'seen' is a set of alert IDs, 'handled' maps alert_id to status and
+        'messages' maps alert_id to (message_id, text).
+        """
+        pass
+
+    @abstractmethod
+    def _write(self, batch: Dict[str, Dict]) -> None:
+        """Persist one batch of buffered changes atomically."""
+        pass
+
+    @abstractmethod
+    def _read_handled_since(self, since: float) -> Dict[str, str]:
+        """Read the statuses of alerts handled at or after since from the backend."""
+        pass
+
+    @abstractmethod
+    def _read_value(self, key: str, default: Optional[str]) -> Optional[str]:
+        """Read a named value from the backend."""
+        pass
@@ -0,0 +1,95 @@
+import os
+import json
+import time
+import fcntl
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Set
+from storage.lease_store import LeaseStore
+
+
+class FileLeaseStore(LeaseStore):
+    """Lease store kept as one JSON file in a directory shared by the workers.
+
+    Every operation holds an exclusive flock on a lock file while it reads,
+    changes and atomically replaces the lease file. Suitable for a local
+    disk or a network filesystem with working POSIX locks (e.g. NFSv4).
+    """
+
+    def __init__(self, directory: str = os.path.join('state', 'leases')):
+        super().__init__()
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.lease_path = os.path.join(directory, 'leases.json')
+        self.lock_path = os.path.join(directory, 'leases.lock')
+        self._lock = threading.Lock()
+
+    def heartbeat(self, worker: str, ttl: float) -> List[str]:
+        now = time.time()
+        with self._state() as state:
+            state['workers'][worker] = now + ttl
+            return sorted(name for name, expires_at in state['workers'].items() if expires_at > now)
+
+    def acquire(self, shard: int, worker: str, ttl: float) -> bool:
+        now = time.time()
+        with self._state() as state:
+            holder = state['leases'].get(str(shard))
+            if holder and holder[0] != worker and holder[1] > now:
+                return False
+            state['leases'][str(shard)] = [worker, now + ttl]
+            return True
+
+    def renew(self, worker: str, ttl: float) -> Set[int]:
+        now = time.time()
+        held = set()
+        with self._state() as state:
+            for shard, holder in state['leases'].items():
+                if holder[0] == worker and holder[1] > now:
+                    holder[1] = now + ttl
+                    held.add(int(shard))
+        return held
+
+    def release(self, shards: Iterable[int], worker: str) -> None:
+        with self._state() as state:
+            for shard in shards:
+                holder = state['leases'].get(str(shard))
+                if holder and holder[0] == worker:
+                    del state['leases'][str(shard)]
+
+    def leave(self, worker: str) -> None:
+        with self._state() as state:
+            state['leases'] = {shard: holder for shard, holder in state['leases'].items() if holder[0] != worker}
+            state['workers'].pop(worker, None)
+
+    @contextmanager
+    def _state(self) -> Iterator[Dict[str, Any]]:
+        """Yield the lease state under the lock and write it back afterwards."""
+        with self._lock, open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                state = self._read()
+                yield state
+                self._write(state)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.lease_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        state.setdefault('leases', {})
+        state.setdefault('workers', {})
+        return state
+
+    def _write(self, state: Dict[str, Any]) -> None:
+        # Expired workers are pruned so the file does not grow with restarts
+        now = time.time()
+        state['workers'] = {name: expires_at for name, expires_at in state['workers'].items() if expires_at > now}
+        temporary_path = f"{self.lease_path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'w') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, self.lease_path)
@@ -0,0 +1,45 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Set
+
+
+class LeaseStore(ABC):
+    """Abstract base class for shard lease backends shared by cooperating workers.
+
+    A lease gives one worker exclusive ownership of a shard until it
+    expires; workers also heartbeat so each can see how many are alive.
+    All times are wall-clock seconds, so hosts sharing a store need
+    roughly synchronised clocks.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @abstractmethod
+    def heartbeat(self, worker: str, ttl: float) -> List[str]:
+        """Mark worker alive for ttl seconds and return every live worker, sorted."""
+        pass
+
+    @abstractmethod
+    def acquire(self, shard: int, worker: str, ttl: float) -> bool:
+        """Take shard for ttl seconds if it is free, expired or already held by worker."""
+        pass
+
+    @abstractmethod
+    def renew(self, worker: str, ttl: float) -> Set[int]:
+        """Extend every unexpired lease worker holds and return those shards."""
+        pass
+
+    @abstractmethod
+    def release(self, shards: Iterable[int], worker: str) -> None:
+        """Give up shards held by worker so others can take them at once."""
+        pass
+
+    @abstractmethod
+    def leave(self, worker: str) -> None:
+        """Release all of worker's leases and remove its heartbeat."""
+        pass
+
+    def close(self) -> None:
+        """Release the backend."""
+        pass
@@ -0,0 +1,43 @@
+from typing import Any, Dict, Optional
+from storage.base_store import StateStore
+
+
+class MemoryStateStore(StateStore):
+    """In-process state store; state is lost when the process exits."""
+
+    def __init__(self):
+        super().__init__()
+        self.seen = set()
+        self.handled: Dict[str, str] = {}
+        self.handled_at: Dict[str, float] = {}
+        self.messages: Dict[str, tuple] = {}
+        self.values: Dict[str, str] = {}
+
+    def load(self) -> Dict[str, Any]:
+        return {
+            'seen': set(self.seen),
+            'handled': dict(self.handled),
+            'messages': dict(self.messages),
+        }
+
+    def _write(self, batch: Dict[str, Dict]) -> None:
+        for alert_id, first_seen in batch['seen'].items():
+            if first_seen is None:
+                self.seen.discard(alert_id)
+            else:
+                self.seen.add(alert_id)
+        for alert_id, (status, ts) in batch['handled'].items():
+            self.handled[alert_id] = status
+            self.handled_at[alert_id] = ts
+        for alert_id, message in batch['messages'].items():
+            if message is None:
+                self.messages.pop(alert_id, None)
+            else:
+                self.messages[alert_id] = message
+        self.values.update(batch['values'])
+
+    def _read_handled_since(self, since: float) -> Dict[str, str]:
+        return {alert_id: self.handled[alert_id] for alert_id, ts in self.handled_at.items() if ts >= since}
+
+    def _read_value(self, key: str, default: Optional[str]) -> Optional[str]:
+        return self.values.get(key, default)
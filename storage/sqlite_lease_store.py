@@ -0,0 +1,90 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Iterable, List, Set
+from storage.lease_store import LeaseStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shard_leases (
+    shard INTEGER PRIMARY KEY,
+    worker TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS workers (
+    worker TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteLeaseStore(LeaseStore):
+    """Lease store in a SQLite file shared by the worker processes of one host.
+
+    Each operation is a single statement or an IMMEDIATE transaction, so
+    SQLite's file lock makes acquisition atomic across processes.
+    """
+
+    def __init__(self, path: str = os.path.join('state', 'leases.db'), busy_timeout: float = 5):
+        super().__init__()
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.connection = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False,
+                                          isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def heartbeat(self, worker: str, ttl: float) -> List[str]:
+        now = time.time()
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO workers (worker, expires_at) VALUES (?, ?)", (worker, now + ttl))
+            self.connection.execute("DELETE FROM workers WHERE expires_at <= ?", (now,))
+            rows = self.connection.execute(
+                "SELECT worker FROM workers WHERE expires_at > ? ORDER BY worker", (now,)).fetchall()
+        return [row[0] for row in rows]
+
+    def acquire(self, shard: int, worker: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            cursor = self.connection.execute(
+                "INSERT INTO shard_leases (shard, worker, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (shard) DO UPDATE SET worker = excluded.worker, expires_at = excluded.expires_at "
+                "WHERE shard_leases.worker = excluded.worker OR shard_leases.expires_at <= ?",
+                (shard, worker, now + ttl, now))
+            return cursor.rowcount == 1
+
+    def renew(self, worker: str, ttl: float) -> Set[int]:
+        now = time.time()
+        with self._lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                self.connection.execute(
+                    "UPDATE shard_leases SET expires_at = ? WHERE worker = ? AND expires_at > ?",
+                    (now + ttl, worker, now))
+                rows = self.connection.execute(
+                    "SELECT shard FROM shard_leases WHERE worker = ? AND expires_at > ?", (worker, now)).fetchall()
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+        return {row[0] for row in rows}
+
+    def release(self, shards: Iterable[int], worker: str) -> None:
+        with self._lock:
+            self.connection.executemany(
+                "DELETE FROM shard_leases WHERE shard = ? AND worker = ?", [(shard, worker) for shard in shards])
+
+    def leave(self, worker: str) -> None:
+        with self._lock:
+            self.connection.execute("DELETE FROM shard_leases WHERE worker = ?", (worker,))
+            self.connection.execute("DELETE FROM workers WHERE worker = ?", (worker,))
+
+    def close(self) -> None:
+        with self._lock:
+            self.connection.close()
@@ -0,0 +1,111 @@
+import os
+import time
+import sqlite3
+from typing import Any, Dict, Optional
+from storage.base_store import StateStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_alerts (
+    alert_id TEXT PRIMARY KEY,
+    first_seen REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS handled_alerts (
+    alert_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    handled_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS handled_alerts_handled_at ON handled_alerts (handled_at);
+CREATE TABLE IF NOT EXISTS alert_messages (
+    alert_id TEXT PRIMARY KEY,
+    message_id INTEGER NOT NULL,
+    text TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteStateStore(StateStore):
+    """Crash-safe state store backed by SQLite in WAL mode."""
+
+    def __init__(self, path: str = os.path.join('state', 'monitor.db'),
+                 handled_retention: float = 30 * 24 * 3600):
+        super().__init__()
+        self.path = path
+        self.handled_retention = handled_retention
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        # One connection shared across engine threads; access is serialised by the store lock
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def load(self) -> Dict[str, Any]:
+        with self._lock:
+            self._compact()
+            cursor = self.connection.cursor()
+            seen = {row[0] for row in cursor.execute("SELECT alert_id FROM seen_alerts")}
+            handled = dict(cursor.execute("SELECT alert_id, status FROM handled_alerts ORDER BY handled_at"))
+            messages = {
+                alert_id: (message_id, text)
+                for alert_id, message_id, text in cursor.execute(
+                    "SELECT alert_id, message_id, text FROM alert_messages")
+            }
+
+        self.logger.info(f"Loaded state: {len(seen)} seen, {len(handled)} handled, {len(messages)} messages")
+        return {'seen': seen, 'handled': handled, 'messages': messages}
+
+    def close(self) -> None:
+        super().close()
+        with self._lock:
+            self.connection.close()
+
+    def _write(self, batch: Dict[str, Dict]) -> None:
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN")
+        try:
+            cursor.executemany(
+                "INSERT OR IGNORE INTO seen_alerts (alert_id, first_seen) VALUES (?, ?)",
+                [(alert_id, ts) for alert_id, ts in batch['seen'].items() if ts is not None])
+            cursor.executemany(
+                "DELETE FROM seen_alerts WHERE alert_id = ?",
+                [(alert_id,) for alert_id, ts in batch['seen'].items() if ts is None])
+            cursor.executemany(
+                "INSERT OR REPLACE INTO handled_alerts (alert_id, status, handled_at) VALUES (?, ?, ?)",
+                [(alert_id, status, ts) for alert_id, (status, ts) in batch['handled'].items()])
+            cursor.executemany(
+                "INSERT OR REPLACE INTO alert_messages (alert_id, message_id, text) VALUES (?, ?, ?)",
+                [(alert_id, message[0], message[1]) for alert_id, message in batch['messages'].items()
+                 if message is not None])
+            cursor.executemany(
+                "DELETE FROM alert_messages WHERE alert_id = ?",
+                [(alert_id,) for alert_id, message in batch['messages'].items() if message is None])
+            cursor.executemany(
+                "INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)",
+                list(batch['values'].items()))
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+
+    def _read_handled_since(self, since: float) -> Dict[str, str]:
+        with self._lock:
+            return dict(self.connection.execute(
+                "SELECT alert_id, status FROM handled_alerts WHERE handled_at >= ?", (since,)))
+
+    def _read_value(self, key: str, default: Optional[str]) -> Optional[str]:
+        with self._lock:
+            row = self.connection.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _compact(self) -> None:
+        """Drop handled records past retention and fold the WAL back into the database."""
+        cutoff = time.time() - self.handled_retention
+        self.connection.execute("DELETE FROM handled_alerts WHERE handled_at < ?", (cutoff,))
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
@@ -0,0 +1,90 @@
+import json
+from clients.alert_parser import parse_alerts
+from handlers.telegram_handler import TelegramHandler
+from processors.alert_processor import AlertProcessor
+from storage.sqlite_store import SQLiteStateStore
+
+
+class RecordingTelegramHandler(TelegramHandler):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.edits = []
+
+    def edit_message(self, message_id, text, remove_buttons=True, reply_markup=None):
+        self.edits.append((message_id, text, reply_markup))
+        return True
+
+
+def digest_members(count):
+    return [{'alert_id': f"a{i}", 'thread_id': f"t{i}", 'message': f"alert {i}"} for i in range(count)]
+
+
+def digest_press(handler, members, message_id, pressed):
+    keyboard = json.loads(handler.digest_keyboard(members))
+    data = keyboard['inline_keyboard'][pressed][1]['callback_data']
+    return {'callback_query': {'id': 'q1', 'data': data, 'from': {'id': 7},
+                               'message': {'message_id': message_id, 'text': "digest",
+                                           'reply_markup': keyboard}}}
+
+
+def remaining_alert_ids(handler, reply_markup):
+    rows = json.loads(reply_markup)['inline_keyboard']
+    return [AlertProcessor.split_callback_data(row[0]['callback_data'])[2] for row in rows]
+
+
+def test_tagged_digest_press_drops_only_the_pressed_row():
+    handler = RecordingTelegramHandler(callback_tag="acme")
+    processor = AlertProcessor(aurora_client=None, telegram_handler=handler)
+    members = digest_members(2)
+    processor.track_messages(members, {'a0': 10, 'a1': 10})
+
+    update = digest_press(handler, members, 10, pressed=0)
+    action, _, alert_id = processor.parse_callback(update)
+    processor.complete_callback(update, action, alert_id, True)
+
+    message_id, _, reply_markup = handler.edits[-1]
+    assert message_id == 10
+    assert remaining_alert_ids(handler, reply_markup) == ['a1']
+
+
+def test_leader_foreign_digest_press_drops_only_the_pressed_row():
+    # The leader tracks nothing for a digest another worker sent
+    handler = RecordingTelegramHandler()
+    processor = AlertProcessor(aurora_client=None, telegram_handler=handler)
+    update = digest_press(handler, digest_members(2), 10, pressed=0)
+    update['callback_query']['message']['text'] = "a0 down\na1 down"
+
+    action, _, alert_id = processor.parse_callback(update)
+    processor.complete_callback(update, action, alert_id, True)
+
+    message_id, text, reply_markup = handler.edits[-1]
+    assert message_id == 10
+    assert text == "a0 down\na1 down"
+    assert remaining_alert_ids(handler, reply_markup) == ['a1']
+
+
+class FakeAuroraClient:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def get_alerts_if_modified(self, known_ids=(), deadline=None):
+        return True, parse_alerts(self.payload, known_ids)
+
+
+def test_integer_alert_ids_survive_a_store_reload(tmp_path):
+    payload = json.dumps([{'id': 101, 'threadID': 7, 'subject': "Disk full"},
+                          {'id': 102, 'threadID': 8, 'subject': "CPU high"}])
+    path = str(tmp_path / "monitor.db")
+
+    store = SQLiteStateStore(path)
+    processor = AlertProcessor(FakeAuroraClient(payload), RecordingTelegramHandler(), state_store=store)
+    new_alerts = processor.check_new_alerts()
+    assert [alert['id'] for alert in new_alerts] == ['101', '102']
+    processor.track_messages([{'alert_id': '101', 'message': "Disk full"}], {'101': 55})
+    store.close()
+
+    store = SQLiteStateStore(path)
+    processor = AlertProcessor(FakeAuroraClient(payload), RecordingTelegramHandler(), state_store=store)
+    assert processor.check_new_alerts() == []
+    assert processor.sent_messages['101'] == (55, "Disk full")
+    store.close()
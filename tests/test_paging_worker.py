@@ -0,0 +1,62 @@
+import threading
+import time
+from handlers.paging_worker import PagingWorker
+from handlers.telegram_dispatcher import PRIORITY_CRITICAL
+
+
+class FakeTwilioHandler:
+    def __init__(self):
+        self.calls = threading.Semaphore(0)
+        self.call_count = 0
+
+    def make_call(self):
+        self.call_count += 1
+        self.calls.release()
+        return f"CA{self.call_count}"
+
+
+def page(alert_id):
+    return {'alert_id': alert_id, 'priority': PRIORITY_CRITICAL, 'page': True}
+
+
+def wait_for_call_placed(worker):
+    deadline = time.time() + 2
+    while not worker.last_call_at and time.time() < deadline:
+        time.sleep(0.01)
+    assert worker.last_call_at
+
+
+def test_page_inside_coalesce_window_is_deferred_not_dropped():
+    twilio = FakeTwilioHandler()
+    worker = PagingWorker(twilio, coalesce_window=0.5)
+    worker.start()
+    try:
+        worker.request_call([page('a1')])
+        assert twilio.calls.acquire(timeout=2)
+        wait_for_call_placed(worker)
+
+        worker.request_call([page('a2')])
+        assert worker.stats['deferred'] == 1
+        assert not twilio.calls.acquire(timeout=0.2)
+        assert twilio.calls.acquire(timeout=2)
+        assert twilio.call_count == 2
+    finally:
+        worker.stop()
+
+
+def test_deferred_page_is_cancelled_once_handled():
+    twilio = FakeTwilioHandler()
+    handled = set()
+    worker = PagingWorker(twilio, is_handled=handled.__contains__, coalesce_window=0.3)
+    worker.start()
+    try:
+        worker.request_call([page('a1')])
+        assert twilio.calls.acquire(timeout=2)
+        wait_for_call_placed(worker)
+
+        worker.request_call([page('a2')])
+        handled.add('a2')
+        assert not twilio.calls.acquire(timeout=0.8)
+        assert worker.stats['cancelled'] == 1
+    finally:
+        worker.stop()
@@ -0,0 +1,42 @@
+from handlers.telegram_dispatcher import PRIORITY_CRITICAL, TelegramDispatcher
+from processors.alert_router import AlertRouter
+
+
+class FakeTelegramHandler:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, message_info):
+        self.sent.append(message_info)
+        return len(self.sent), 0
+
+    def digest_keyboard(self, members):
+        return "{}"
+
+
+def routed_messages(count, severity):
+    router = AlertRouter()
+    alerts = [{'id': str(i), 'threadID': f"t{i}", 'customer': 'acme', 'environment': 'prod',
+               'subject': f"Disk {i} full", 'severity': severity} for i in range(count)]
+    return [router.route(alert).format(alert, "description") for alert in alerts]
+
+
+def test_default_routed_trivial_alerts_fold_into_digests():
+    dispatcher = TelegramDispatcher(FakeTelegramHandler(), digest_threshold=20, page_priority=PRIORITY_CRITICAL)
+    dispatcher.submit(routed_messages(50, 'warning'))
+
+    dispatcher._fold_into_digests()
+
+    queued = [entry[3] for entry in dispatcher._queue]
+    assert all("members" in message_info for message_info in queued)
+    assert sum(len(message_info["members"]) for message_info in queued) == 50
+    assert len(queued) == 3
+
+
+def test_critical_alerts_are_not_folded():
+    dispatcher = TelegramDispatcher(FakeTelegramHandler(), digest_threshold=20)
+    dispatcher.submit(routed_messages(30, 'critical'))
+
+    dispatcher._fold_into_digests()
+
+    assert not any("members" in entry[3] for entry in dispatcher._queue)
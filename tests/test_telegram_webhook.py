@@ -0,0 +1,50 @@
+import json
+import http.client
+import pytest
+from handlers.telegram_webhook import SECRET_HEADER, TelegramWebhookServer
+
+
+@pytest.fixture
+def webhook():
+    server = TelegramWebhookServer(port=0, host="127.0.0.1", secret_token="s3cret", max_body_bytes=1024)
+    server.start()
+    yield server
+    server.stop()
+
+
+def post(server, body, secret="s3cret", path=None, headers=None):
+    host, port = server._server.server_address[:2]
+    connection = http.client.HTTPConnection(host, port, timeout=5)
+    request_headers = {SECRET_HEADER: secret, "Content-Type": "application/json"}
+    request_headers.update(headers or {})
+    connection.request("POST", path or server.path, body=body, headers=request_headers)
+    status = connection.getresponse().status
+    connection.close()
+    return status
+
+
+def test_callback_query_is_queued(webhook):
+    update = {"update_id": 1, "callback_query": {"id": "q", "data": "dismiss:t:a"}}
+    assert post(webhook, json.dumps(update)) == 200
+    assert webhook.get_updates() == [update]
+
+
+def test_bad_secret_is_rejected(webhook):
+    assert post(webhook, json.dumps({"callback_query": {}}), secret="wrong") == 403
+    assert webhook.get_updates() == []
+    assert webhook.stats['rejected'] == 1
+
+
+def test_oversized_body_is_rejected(webhook):
+    assert post(webhook, json.dumps({"callback_query": {"data": "x" * 2048}})) == 413
+    assert webhook.get_updates() == []
+
+
+def test_oversized_content_length_is_rejected_before_reading(webhook):
+    # Claims far more than is sent; a server that tried to read it would hang
+    assert post(webhook, b"{}", headers={"Content-Length": str(10 ** 9)}) == 413
+
+
+def test_non_object_body_is_rejected(webhook):
+    assert post(webhook, json.dumps([1, 2, 3])) == 400
+    assert post(webhook, json.dumps("callback_query")) == 400
@@ -0,0 +1,32 @@
+import time
+from typing import Tuple, Union
+
+
+class Deadline:
+    """A point in time that a chain of calls must finish by.
+
+    Created once per monitor cycle and passed down, so every request in the
+    cycle shares one budget instead of each getting its own full timeout.
+    """
+
+    def __init__(self, budget: float):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        """Seconds left, never negative."""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def clamp(self, timeout: Union[float, Tuple[float, float], None]) -> Union[float, Tuple[float, float]]:
+        """Shorten a requests-style timeout, scalar or (connect, read), to the time left."""
+        remaining = max(self.remaining(), 0.001)
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(min(part, remaining) for part in timeout)
+        return min(timeout, remaining)
+
+
@@ -0,0 +1,43 @@
+import time
+import threading
+
+
+class TokenBucket:
+    """Thread-safe token bucket that can also be paused for a server-imposed back-off.
+
+    Tokens may go negative when callers sharing a bucket race, which simply
+    lengthens the next wait.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """Seconds until tokens are available; 0 if they are available now."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(self.paused_until - now, 0)
+            if self.tokens < tokens:
+                wait = max(wait, (tokens - self.tokens) / self.rate)
+            return wait
+
+    def consume(self, tokens: float = 1) -> None:
+        """Take tokens without checking availability."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= tokens
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for the next seconds, e.g. after a 429 retry_after."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now